@@ -0,0 +1,211 @@
+"""
+Calcul des décisions de l'IA hors du thread principal de Tk.
+
+AIWorker fait tourner BackgammonAI.ai_move dans un thread de fond :
+- submit() envoie une demande (clé de position, coups valides, dés restants) et
+  rend la main immédiatement ;
+- poll(), appelé périodiquement depuis root.after, renvoie le résultat quand il
+  est prêt (None sinon) ;
+- cancel() abandonne les demandes en cours : le résultat d'une demande annulée
+  n'est jamais livré (nouvelle partie, fermeture de la fenêtre), et une recherche
+  avec budget de temps (BackgammonAI.anytime_play) est interrompue ;
+- close() arrête le thread.
+
+Réflexion anticipée : pendant le tour de l'adversaire, ponder() calcule en fond
+la séquence de l'IA pour chacun des 21 lancers possibles depuis la position où
+l'IA aura le trait (connue si l'adversaire a fini son tour, sinon prédite en lui
+faisant jouer sa meilleure séquence à 1 pli). Quand la demande réelle arrive avec
+un lancer complet depuis cette position, la séquence est servie sans recherche.
+Une demande réelle interrompt toujours la réflexion anticipée. Elle ne sert
+qu'avec une IA à budget de temps (time_budget), seule dont la recherche
+(anytime_play) peut être interrompue.
+
+L'IA travaille sur son propre BackgammonEnv, positionné par set_position_key à
+chaque demande : l'environnement de l'interface n'est jamais modifié par le
+thread de fond, et le rendu peut continuer pendant la réflexion.
+
+Un thread plutôt qu'un processus : l'IA (poids, historique d'apprentissage,
+cache d'évaluations partagé) reste un seul objet, utilisable par learn_from_game
+depuis l'interface. Le calcul en NumPy relâche régulièrement le GIL, ce qui
+suffit à garder la boucle Tk fluide.
+"""
+import queue
+import threading
+import time
+from backgammon_env import BackgammonEnv
+from backgammon_ai import DICE_ROLLS
+
+# Intervalle de scrutation conseillé des résultats depuis la boucle Tk (ms)
+POLL_INTERVAL_MS = 15
+
+
+def roll_key(dice):
+    """Clé d'un lancer complet, indépendante de l'ordre des dés"""
+    return tuple(sorted(dice))
+
+
+class AIWorker:
+    def __init__(self, ai):
+        # L'IA passe sur un environnement privé au thread de fond
+        ai.env = BackgammonEnv(record_history=False)
+        self.ai = ai
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._lock = threading.Lock()
+        self._generation = 0  # les demandes d'une génération antérieure sont annulées
+        self._next_id = 0
+        # Réflexion anticipée (état lu et écrit par le thread de fond uniquement)
+        self._pondering = False
+        self._ponder_key = None
+        self._pondered = {}  # (clé de position, clé de lancer) -> séquence
+        self.ponder_stats = {"hits": 0, "misses": 0, "computed": 0}
+        self._thread = threading.Thread(target=self._run, name="ai-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, position_key, valid_moves, remaining_dice):
+        """Demande le coup de l'IA pour la position donnée ; renvoie l'identifiant de la demande"""
+        with self._lock:
+            self._next_id += 1
+            request_id = self._next_id
+            self._requests.put(("move", request_id, self._generation, position_key,
+                                list(valid_moves), list(remaining_dice)))
+            self._interrupt_pondering()
+        return request_id
+
+    def ponder(self, position_key, predict_dice=None):
+        """
+        Lance la réflexion anticipée depuis `position_key`. Avec predict_dice, la
+        position est celle de l'adversaire avant son coup : sa séquence pour ces dés
+        est d'abord prédite, et la réflexion part de la position qui en résulte.
+        """
+        if self.ai.time_budget is None:
+            return
+        with self._lock:
+            self._requests.put(("ponder", None, self._generation, position_key,
+                                None, list(predict_dice) if predict_dice else None))
+            self._interrupt_pondering()
+
+    def poll(self):
+        """
+        Résultat de la prochaine demande terminée, ou None si rien n'est prêt :
+        dictionnaire avec "id", "move" (coup ou None), "seconds" (durée de réflexion),
+        "stats" (BackgammonAI.last_search_stats après la décision) et "pondered"
+        (True si le coup vient de la réflexion anticipée).
+        Une exception levée par l'IA est relancée ici, dans le thread appelant.
+        """
+        while True:
+            try:
+                result = self._results.get_nowait()
+            except queue.Empty:
+                return None
+            if result["generation"] != self._generation:
+                continue  # demande annulée entre-temps
+            if "error" in result:
+                raise result["error"]
+            return result
+
+    def cancel(self):
+        """Annule toutes les demandes en attente ou en cours de calcul"""
+        with self._lock:
+            self._generation += 1
+        self.ai.interrupt()
+
+    def close(self, timeout=None):
+        """Annule les demandes et arrête le thread (attend au plus `timeout` secondes)"""
+        self.cancel()
+        self._requests.put(None)
+        self._thread.join(timeout)
+
+    def _interrupt_pondering(self):
+        # Appelé sous verrou : une demande de coup en cours n'est jamais interrompue ici
+        if self._pondering:
+            self.ai.interrupt()
+
+    def _start_pondering(self, generation):
+        """
+        Lève l'interruption avant un calcul anticipé s'il est toujours d'actualité
+        (génération courante, aucune autre tâche en attente). Sous verrou, pour ne
+        pas effacer l'interruption demandée par un submit() concurrent.
+        """
+        with self._lock:
+            self._pondering = generation == self._generation and self._requests.empty()
+            if self._pondering:
+                self.ai.resume()
+            return self._pondering
+
+    def _run(self):
+        while True:
+            request = self._requests.get()
+            try:
+                if request is None:
+                    return
+                kind, request_id, generation, position_key, valid_moves, dice = request
+                if generation != self._generation:
+                    continue  # annulée avant d'avoir commencé
+                if kind == "ponder":
+                    try:
+                        self._ponder(generation, position_key, dice)
+                    except Exception:
+                        # La réflexion anticipée n'est qu'une optimisation : on l'abandonne,
+                        # la demande réelle refera le calcul (et remontera l'erreur éventuelle)
+                        self._ponder_key, self._pondered = None, {}
+                    finally:
+                        self._pondering = False
+                    continue
+                with self._lock:
+                    self.ai.resume()
+                result = {"id": request_id, "generation": generation, "pondered": False}
+                start = time.perf_counter()
+                try:
+                    self.ai.env.set_position_key(position_key)
+                    play = self._pondered.get((position_key, roll_key(dice)))
+                    if play and play[0] in valid_moves:
+                        self.ponder_stats["hits"] += 1
+                        self.ai._plan(play, dice)
+                        self.ai.last_search_stats = {}
+                        result["move"] = play[0]
+                        result["pondered"] = True
+                    else:
+                        if position_key == self._ponder_key and len(dice) in (2, 4):
+                            self.ponder_stats["misses"] += 1
+                        result["move"] = self.ai.ai_move(valid_moves, dice)
+                except Exception as error:
+                    result["error"] = error
+                result["seconds"] = time.perf_counter() - start
+                result["stats"] = dict(self.ai.last_search_stats)
+                self._results.put(result)
+            finally:
+                self._requests.task_done()
+
+    def _ponder(self, generation, position_key, predict_dice):
+        """Calcule les séquences des 21 lancers, une par une, tant qu'aucune autre tâche n'attend"""
+        env = self.ai.env
+        env.set_position_key(position_key)
+        if predict_dice:
+            if not self._start_pondering(generation):
+                return
+            # Séquence la plus probable de l'adversaire : sa meilleure à 1 pli selon notre évaluation
+            for move in self.ai.search_play(predict_dice, depth=1):
+                env.apply(move)
+            if env.check_win():
+                return
+            env.end_turn()
+            position_key = env.position_key()
+        # En course de bearing off, ai_move joue d'après la base : rien à anticiper
+        if self.ai.bearoff_db is not None and self.ai._is_bearoff_race():
+            return
+        if position_key != self._ponder_key:
+            self._ponder_key = position_key
+            self._pondered = {}
+        for dice, _ in DICE_ROLLS:
+            key = (position_key, roll_key(dice))
+            if key in self._pondered:
+                continue
+            if not self._start_pondering(generation):
+                return
+            env.set_position_key(position_key)
+            play = self.ai.anytime_play(dice)
+            if self.ai.last_search_stats["interrupted"]:
+                return  # séquence incomplète : une autre tâche attend
+            self._pondered[key] = play
+            self.ponder_stats["computed"] += 1
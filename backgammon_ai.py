@@ -1,20 +1,89 @@
 # backgammon_ai.py
-import tkinter as tk
-from tkinter import messagebox, scrolledtext
+# Cœur de l'IA, importable sans interface graphique (voir bench_startup.py) ;
+# l'interface Joueur vs IA se trouve dans backgammon_gui_ai.py.
 import random
 import numpy as np
 import json
+import os
+import time
 from pathlib import Path
-from backgammon_env import BackgammonEnv, find_subset
-from backgammon_gui import Board, CANVAS_WIDTH, CANVAS_HEIGHT, BackgammonGUI
+from backgammon_env import BackgammonEnv
+from evaluation_cache import shared_cache
+from td_network import TDNetwork, encode_positions
+from bearoff_db import BearoffDatabase, BEAROFF_DB_FILE, home_counts
+from game_record import GameRecordWriter, player_type, weights_hash
+import profiling
+
+# Ordre des caractéristiques de position, aligné sur les clés des poids
+FEATURE_NAMES = ["capture", "barrier", "protect", "home_board", "bear_off", "advance"]
+
+# Caractéristiques booléennes d'un coup simple (les premières colonnes de _move_features)
+MOVE_FEATURES = FEATURE_NAMES[:5]
+
+# Poids initiaux, sans fichier ai_weights.json
+DEFAULT_WEIGHTS = {
+    "capture": 15.0,          # Priorité à la capture des pions adverses
+    "barrier": 10.0,          # Création de barrières pour bloquer
+    "protect": 8.0,           # Protection des pions isolés
+    "home_board": 12.0,       # Priorité à ramener les pions dans son jan intérieur
+    "bear_off": 20.0,         # Priorité maximale pour sortir les pions en fin de partie
+    "advance": 0.5            # Petit bonus pour l'avancement général
+}
+
+# Les 21 lancers distincts avec leur probabilité (1/36 pour un double, 2/36 sinon)
+DICE_ROLLS = [([d1] * 4 if d1 == d2 else [d2, d1], (1 if d1 == d2 else 2) / 36)
+              for d1 in range(1, 7) for d2 in range(d1, 7)]
+
+# Score d'une position gagnée, supérieur à toute évaluation heuristique
+WIN_SCORE = 1e9
+
+# Profondeur maximale de l'approfondissement itératif (mode avec budget de temps)
+ANYTIME_MAX_DEPTH = 4
+
+
+class SearchTimeout(Exception):
+    """Levée dans la recherche quand l'échéance de anytime_play est dépassée"""
+
+
+_bearoff_db = None
+
+
+def _default_bearoff_db():
+    """Ouvre (une seule fois par processus) la base de bearing off si elle a été générée"""
+    global _bearoff_db
+    if _bearoff_db is None and Path(BEAROFF_DB_FILE).exists():
+        _bearoff_db = BearoffDatabase(BEAROFF_DB_FILE)
+    return _bearoff_db
+
 
 class BackgammonAI:
-    def __init__(self, env):
+    def __init__(self, env, search_depth=0, beam_width=4, prune_probability=0.0, cache=None,
+                 network=None, bearoff_db=None, time_budget=None):
         self.env = env
+        # Base de bearing off mappée en mémoire (bearoff_db.py), utilisée en fin de course
+        self.bearoff_db = bearoff_db if bearoff_db is not None else _default_bearoff_db()
+        # Évaluateur neuronal TD(λ) optionnel (td_network.TDNetwork) ; remplace les heuristiques
+        self.network = network
+        # Cache d'évaluations (partagé par défaut entre toutes les IA du processus)
+        self.cache = shared_cache if cache is None else cache
         self.learning_rate = 0.1
         self.weights = self._load_weights()
         self.game_history = []
         self.direction = 1 if self.env.current_player == 1 else -1
+        # Recherche expectiminimax : 0 = heuristique coup par coup, 1 à 3 = profondeur en plis
+        self.search_depth = search_depth
+        # Nombre de séquences développées aux nœuds internes (après tri par évaluation statique)
+        self.beam_width = beam_width
+        # Sous ce seuil de probabilité d'atteindre un nœud, on l'évalue statiquement sans le développer
+        self.prune_probability = prune_probability
+        # Budget de temps par décision (secondes) : active la recherche à approfondissement itératif
+        self.time_budget = time_budget
+        self.last_search_stats = {}
+        self._nodes = 0
+        self._deadline = None
+        self._interrupted = False
+        # Suite de la séquence choisie par ai_move : (clé de position attendue, dés restants triés, coups restants)
+        self._planned = None
 
     def _load_weights(self):
         """Charge ou initialise les poids d'apprentissage avec des règles de base"""
@@ -22,28 +91,30 @@ class BackgammonAI:
         if weights_file.exists():
             with open(weights_file, "r") as f:
                 return json.load(f)
-        return {
-            "capture": 15.0,          # Priorité à la capture des pions adverses
-            "barrier": 10.0,          # Création de barrières pour bloquer
-            "protect": 8.0,           # Protection des pions isolés
-            "home_board": 12.0,       # Priorité à ramener les pions dans son jan intérieur
-            "bear_off": 20.0,         # Priorité maximale pour sortir les pions en fin de partie
-            "advance": 0.5            # Petit bonus pour l'avancement général
-        }
+        return dict(DEFAULT_WEIGHTS)
 
     def _save_weights(self):
         """Sauvegarde les poids appris"""
         with open("ai_weights.json", "w") as f:
             json.dump(self.weights, f, indent=4)
 
-    def learn_from_game(self, won):
-        """Apprend de la partie qui vient de se terminer"""
+    def _weight_deltas(self, won):
+        """Calcule les ajustements de poids issus de la partie qui vient de se terminer"""
         adjustment = self.learning_rate if won else -self.learning_rate
-        
-        # Ajuste les poids en fonction du résultat
+        deltas = {}
         for move_type, count in self.game_history:
             if move_type in self.weights:
-                self.weights[move_type] += adjustment * count
+                deltas[move_type] = deltas.get(move_type, 0.0) + adjustment * count
+        return deltas
+
+    def _apply_deltas(self, deltas):
+        for move_type, delta in deltas.items():
+            self.weights[move_type] += delta
+
+    def learn_from_game(self, won):
+        """Apprend de la partie qui vient de se terminer"""
+        # Ajuste les poids en fonction du résultat
+        self._apply_deltas(self._weight_deltas(won))
         
         self._save_weights()
         self.game_history = []  # Réinitialise l'historique
@@ -53,107 +124,325 @@ class BackgammonAI:
         if not valid_moves:
             return None, None, None
 
+        # En bearing off sans contact, la base donne le coup exact
+        if self.bearoff_db is not None and self._is_bearoff_race():
+            play = self._best_bearoff_play(remaining_dice)
+            if play and play[0] in valid_moves:
+                self.last_search_stats = {}
+                return play[0]
+
+        # Avec un budget de temps, la recherche ou le réseau, la séquence choisie est jouée
+        # coup par coup sans nouvelle recherche
+        if self.time_budget is not None or self.search_depth > 0 or self.network is not None:
+            play = self._planned_move(valid_moves, remaining_dice) or self._choose_play(remaining_dice)
+            if play and play[0] in valid_moves:
+                self._plan(play, remaining_dice)
+                return play[0]
+
         # Prioriser les mouvements pour sortir de la barre
         bar_moves = [move for move in valid_moves if move[0] == "bar"]
         if bar_moves:
             # Évalue et choisit le meilleur mouvement depuis la barre
-            scored_moves = [(self._evaluate_move(move), move) for move in bar_moves]
-            scored_moves.sort(reverse=True)
-            return scored_moves[0][1]
+            valid_moves = bar_moves
 
-        # Évalue et score chaque mouvement possible
-        scored_moves = [(self._evaluate_move(move), move) for move in valid_moves]
-        scored_moves.sort(reverse=True)
-        return scored_moves[0][1]
+        # Évalue tous les mouvements possibles d'un coup (une ligne de caractéristiques par coup)
+        scores = self._score_moves(valid_moves)
+        return max(zip(scores.tolist(), valid_moves))[1]
 
-    def _evaluate_move(self, move):
-        """Évalue un mouvement selon les règles du backgammon"""
-        src, dest, _ = move
-        score = 0
-        
-        # Priorité maximale à la sortie de la barre (src = -1 pour joueur 1 ou 24 pour joueur 0)
-        if (self.env.current_player == 1 and src == -1) or \
-           (self.env.current_player == 0 and src == 24):
-            score += 30.0  # Score plus élevé que toutes les autres actions
-            self.game_history.append(("bar_exit", 1))
-            return score  # Retourne immédiatement car c'est obligatoire de sortir de la barre
-        
-        # Capture d'un pion adverse
-        if self._captures_opponent(move):
-            score += self.weights["capture"]
-            self.game_history.append(("capture", 1))
-        
-        # Création d'une barrière (2 pions ou plus)
-        if self._creates_barrier(move):
-            score += self.weights["barrier"]
-            self.game_history.append(("barrier", 1))
-        
-        # Protection d'un pion isolé
-        if self._protects_isolated(move):
-            score += self.weights["protect"]
-            self.game_history.append(("protect", 1))
-        
-        # Bonus pour entrer dans son jan intérieur (les 6 dernières cases)
-        if self._enters_home_board(move):
-            score += self.weights["home_board"]
-            self.game_history.append(("home_board", 1))
-        
-        # Bonus pour sortir un pion (bearing off)
-        if self._is_bearing_off(move):
-            score += self.weights["bear_off"]
-            self.game_history.append(("bear_off", 1))
-        
-        # Petit bonus pour l'avancement général
-        score += self._calculate_advance_bonus(src, dest)
-        
-        return score
-
-    def _captures_opponent(self, move):
-        """Vérifie si le mouvement capture un pion adverse"""
-        _, dest, _ = move
-        if dest == 0 or dest == 25:  # Bearing off
-            return False
-        return self.env.board[dest-1, 1-self.env.current_player] == 1
-
-    def _creates_barrier(self, move):
-        """Vérifie si le mouvement crée une barrière"""
-        _, dest, _ = move
-        if dest == 0 or dest == 25:
-            return False
-        return self.env.board[dest-1, self.env.current_player] >= 1
-
-    def _protects_isolated(self, move):
-        """Vérifie si le mouvement protège un pion isolé"""
-        _, dest, _ = move
-        if dest == 0 or dest == 25:
-            return False
-        return self.env.board[dest-1, self.env.current_player] == 1
-
-    def _enters_home_board(self, move):
-        """Vérifie si le mouvement amène un pion dans le jan intérieur"""
-        _, dest, _ = move
-        if self.env.current_player == 0:
-            return 0 <= dest <= 6
-        else:
-            return 19 <= dest <= 24
+    def _score_moves(self, moves, position_key=None):
+        """Score de chaque coup : produit de la matrice de caractéristiques par le vecteur de poids"""
+        features = self._move_features(moves, position_key)
+        scores = features @ self._weight_vector()
 
-    def _is_bearing_off(self, move):
-        """Vérifie si le mouvement permet de sortir un pion"""
-        _, dest, _ = move
-        return dest == 25 if self.env.current_player == 1 else dest == 0
-
-    def _calculate_advance_bonus(self, src, dest):
-        """Calcule un bonus basé sur l'avancement vers l'objectif"""
-        # Vérifiez si src et dest sont des entiers
-        if not isinstance(src, int) or not isinstance(dest, int):
-            return 0  # Pas de bonus pour les mouvements spéciaux comme "bar"
-
-        if self.env.current_player == 0:
-            progress = (24 - dest) - (24 - src)
+        # Priorité maximale à la sortie de la barre (src = -1 pour joueur 1 ou 24 pour joueur 0)
+        exit_src = -1 if self.env.current_player == 1 else 24
+        bar_exit = np.array([move[0] == exit_src for move in moves])
+        scores[bar_exit] = 30.0  # Score plus élevé que toutes les autres actions
+
+        # Historique pour l'apprentissage : occurrences de chaque caractéristique sur les coups évalués
+        if bar_exit.any():
+            self.game_history.append(("bar_exit", int(bar_exit.sum())))
+        counts = features[~bar_exit, :len(MOVE_FEATURES)].sum(axis=0)
+        for name, count in zip(MOVE_FEATURES, counts.tolist()):
+            if count:
+                self.game_history.append((name, int(count)))
+        return scores
+
+    def _evaluate_move(self, move, position_key=None):
+        """Évalue un mouvement selon les règles du backgammon"""
+        return float(self._score_moves([move], position_key)[0])
+
+    def _move_features(self, moves, position_key=None):
+        """
+        Matrice (n_coups × 6) des caractéristiques des coups, dans l'ordre de FEATURE_NAMES.
+        Elle ne dépend que de la position et des coups : on la met en cache
+        (et pas les scores, qui changent à chaque mise à jour des poids).
+        """
+        if position_key is None:
+            position_key = self.env.position_key()
+        cache_key = (position_key, tuple(moves))
+        features = self.cache.get(cache_key)
+        if features is None:
+            features = self._compute_move_features(moves)
+            self.cache.put(cache_key, features)
+        return features
+
+    def _compute_move_features(self, moves):
+        """Calcule en une passe vectorisée les caractéristiques de tous les coups"""
+        player = self.env.current_player
+        # Les coups depuis la barre ont une source 0 (aucun bonus d'avancement)
+        coords = np.array([(0 if src == "bar" else src, dest) for src, dest, _ in moves])
+        src, dest = coords[:, 0], coords[:, 1]
+        on_board = (dest >= 1) & (dest <= 24)
+        idx = (dest - 1) % 24  # les sorties (0 ou 25) sont neutralisées par on_board
+        own = self.env.board[idx, player]
+        opp = self.env.board[idx, 1 - player]
+        features = np.empty((len(moves), len(FEATURE_NAMES)))
+        features[:, 0] = on_board & (opp == 1)   # Capture d'un pion adverse
+        features[:, 1] = on_board & (own >= 1)   # Création d'une barrière (2 pions ou plus)
+        features[:, 2] = on_board & (own == 1)   # Protection d'un pion isolé
+        if player == 0:
+            features[:, 3] = dest <= 6           # Entrée dans son jan intérieur
+            features[:, 4] = dest == 0           # Sortie d'un pion (bearing off)
         else:
-            progress = src - dest
-
-        return progress * self.weights["advance"]
+            features[:, 3] = on_board & (dest >= 19)
+            features[:, 4] = dest == 25
+        features[:, 5] = (src > 0) * (src - dest)  # Avancement général
+        return features
+
+    def _is_bearoff_race(self):
+        """
+        Vrai si le joueur au trait a tous ses pions dans son jan intérieur, sans contact
+        possible, et que la base de bearing off couvre son nombre de pions restants
+        (une base générée avec --max-checkers < 15 ne couvre pas toutes les positions).
+        """
+        # Aucun pion hors du jan intérieur (barre comprise), et aucun pion adverse
+        # à plus de 18 points de sa sortie, c'est-à-dire dans notre jan intérieur ou sur la barre
+        player = self.env.current_player
+        return (self.env.outside_home[player] == 0 and self.env.furthest_back[1 - player] <= 18
+                and 15 - self.env.off[player] <= self.bearoff_db.max_checkers)
+
+    def _best_bearoff_play(self, dice):
+        """Séquence qui minimise l'espérance du nombre de lancers restants (base de bearing off)"""
+        player = self.env.current_player
+        best, best_rolls = None, float("inf")
+        for play in self.env.legal_plays(dice):
+            tokens = self._apply_play(play)
+            rolls = self.bearoff_db.expected_rolls(home_counts(self.env.board, player))
+            self._undo_play(tokens)
+            if rolls < best_rolls:
+                best, best_rolls = play, rolls
+        return best
+
+    def _side_features(self, player):
+        """Caractéristiques de la position pour un joueur, dans l'ordre de FEATURE_NAMES"""
+        env = self.env
+        own = env.board[:, player]
+        # Pips, pions sortis et pions hors du jan intérieur sont maintenus par l'environnement
+        return np.array([
+            env.bar[1 - player],                                # pions adverses sur la barre
+            np.count_nonzero(own >= 2),                         # points faits
+            -np.count_nonzero(own == 1),                        # pions isolés (pénalité)
+            15 - env.outside_home[player] - env.off[player],    # pions dans le jan intérieur
+            env.off[player],                                    # pions sortis
+            -env.pips[player],                                  # avancement (course)
+        ], dtype=float)
+
+    def _weight_vector(self):
+        return np.array([self.weights[name] for name in FEATURE_NAMES], dtype=float)
+
+    def _evaluate_position(self, player, to_move=None):
+        """
+        Évalue la position courante du point de vue de `player` (positif = favorable).
+        to_move : joueur au trait dans la position évaluée (env.current_player par défaut) ;
+        après une séquence jouée, c'est l'adversaire, comme dans TDNetwork.best_play.
+        """
+        self._nodes += 1
+        if self.network is not None:
+            # Probabilité de victoire du Joueur 1 ramenée dans [-1, 1] pour `player`
+            side = self.env.current_player if to_move is None else to_move
+            x = encode_positions(self.env.board[None], [self.env.bar], [side])
+            value = 2 * float(self.network.forward(x)[0]) - 1
+            return value if player == 0 else -value
+        # Écart de caractéristiques Joueur 1 - Joueur 2, mis en cache par position
+        diff = self.cache.get_or_compute(
+            self.env.position_key(), lambda: self._side_features(0) - self._side_features(1))
+        if player == 1:
+            diff = -diff
+        return float(diff @ self._weight_vector())
+
+    def search_play(self, dice, depth=None):
+        """
+        Choisit la meilleure séquence complète pour `dice` par expectiminimax :
+        - 1 pli : évaluation statique de la position obtenue
+        - 2 plis : moyenne sur les 21 lancers adverses de sa meilleure réponse
+        - 3 plis : puis moyenne sur nos 21 lancers suivants
+        Les séquences sont triées par évaluation statique, seules les `beam_width`
+        meilleures sont développées aux nœuds internes, et les nœuds dont la
+        probabilité d'être atteints est inférieure à `prune_probability` sont
+        évalués sans être développés.
+        Les statistiques (profondeur, nœuds, nœuds/s) sont dans last_search_stats.
+        """
+        depth = self.search_depth if depth is None else depth
+        depth = max(1, depth)
+        self._nodes = 0
+        start = time.perf_counter()
+        value, play = self._max_node(dice, depth, 1.0, root=True)
+        elapsed = time.perf_counter() - start
+        self.last_search_stats = {
+            "depth": depth,
+            "nodes": self._nodes,
+            "seconds": elapsed,
+            "nodes_per_second": self._nodes / elapsed if elapsed > 0 else 0.0,
+            "value": value,
+        }
+        return play
+
+    def anytime_play(self, dice, budget=None, max_depth=ANYTIME_MAX_DEPTH):
+        """
+        Recherche à approfondissement itératif dans un budget de temps (secondes,
+        time_budget par défaut, ValueError sans l'un ni l'autre) : search_play aux
+        profondeurs 1, 2, ... max_depth tant que l'échéance n'est pas atteinte, en
+        gardant la séquence de la dernière profondeur terminée. La profondeur 1 est
+        toujours terminée (elle ne coûte qu'une évaluation statique par séquence) ;
+        au-delà, la recherche est interrompue au plus tard un nœud de hasard après
+        l'échéance.
+        last_search_stats indique la profondeur atteinte, les nœuds évalués (toutes
+        profondeurs confondues) et si la recherche a été interrompue.
+        """
+        budget = self.time_budget if budget is None else budget
+        if budget is None:
+            raise ValueError("anytime_play demande un budget de temps (argument budget ou time_budget de l'IA)")
+        start = time.perf_counter()
+        key = self.env.position_key()
+        best_play, best_value, completed, nodes = (), None, 0, 0
+        timed_out = False
+        for depth in range(1, max_depth + 1):
+            self._deadline = None if depth == 1 else start + budget
+            try:
+                play = self.search_play(dice, depth)
+            except SearchTimeout:
+                # La recherche interrompue laisse l'environnement au milieu d'une séquence
+                self.env.set_position_key(key)
+                nodes += self._nodes
+                timed_out = True
+                break
+            finally:
+                self._deadline = None
+            nodes += self._nodes
+            best_play, best_value, completed = play, self.last_search_stats["value"], depth
+            if time.perf_counter() - start >= budget or abs(best_value) >= WIN_SCORE or self._interrupted:
+                break
+        elapsed = time.perf_counter() - start
+        self.last_search_stats = {
+            "depth": completed,
+            "nodes": nodes,
+            "seconds": elapsed,
+            "nodes_per_second": nodes / elapsed if elapsed > 0 else 0.0,
+            "value": best_value,
+            "budget": budget,
+            "timed_out": timed_out,
+            "interrupted": self._interrupted,
+        }
+        return best_play
+
+    def interrupt(self):
+        """
+        Interrompt la recherche en cours (depuis un autre thread) comme si son échéance
+        était passée ; les recherches suivantes s'arrêtent après la profondeur 1 jusqu'à resume().
+        """
+        self._interrupted = True
+
+    def resume(self):
+        """Lève l'interruption demandée par interrupt()"""
+        self._interrupted = False
+
+    def _choose_play(self, dice):
+        """Meilleure séquence pour `dice` : budget de temps, recherche à profondeur fixe, ou réseau"""
+        if self.time_budget is not None:
+            return self.anytime_play(dice)
+        if self.search_depth > 0:
+            return self.search_play(dice)
+        # Toutes les séquences du lancer sont évaluées en un seul produit matriciel
+        return self.network.best_play(self.env, dice)
+
+    def _plan(self, play, dice):
+        """
+        Mémorise la fin de la séquence choisie pour le lancer `dice`, avec la position
+        et les dés restants attendus après son premier coup
+        """
+        self._planned = None
+        if len(play) > 1:
+            remaining = list(dice)
+            remaining.remove(play[0][2])
+            token = self.env.apply(play[0])
+            self._planned = (self.env.position_key(), sorted(remaining), play[1:])
+            self.env.undo(token)
+
+    def _planned_move(self, valid_moves, dice):
+        """Suite de la séquence mémorisée si la position et les dés sont ceux attendus, sinon None"""
+        planned, self._planned = self._planned, None
+        if (planned is not None and planned[0] == self.env.position_key()
+                and planned[1] == sorted(dice) and planned[2][0] in valid_moves):
+            return planned[2]
+        return None
+
+    def _apply_play(self, play):
+        return [self.env.apply(move) for move in play]
+
+    def _undo_play(self, tokens):
+        for token in reversed(tokens):
+            self.env.undo(token)
+
+    def _max_node(self, dice, depth, probability, root=False):
+        """Nœud de décision du joueur au trait ; renvoie (valeur pour ce joueur, meilleure séquence)"""
+        env = self.env
+        player = env.current_player
+        plays = env.legal_plays(dice)
+        if not plays:
+            env.current_player = 1 - player
+            value = -self._chance_node(depth - 1, probability)
+            env.current_player = player
+            return value, ()
+
+        # Tri des séquences par évaluation statique (ordonnancement des coups)
+        scored = []
+        for play in plays:
+            tokens = self._apply_play(play)
+            if env.check_win():
+                self._undo_play(tokens)
+                return WIN_SCORE, play
+            # Après la séquence, c'est à l'adversaire de jouer
+            scored.append((self._evaluate_position(player, to_move=1 - player), play))
+            self._undo_play(tokens)
+        scored.sort(key=lambda item: item[0], reverse=True)
+        if depth == 1:
+            return scored[0]
+        if not root:
+            scored = scored[:self.beam_width]
+
+        best_value, best_play = -float("inf"), scored[0][1]
+        for _, play in scored:
+            tokens = self._apply_play(play)
+            env.current_player = 1 - player
+            value = -self._chance_node(depth - 1, probability)
+            self._undo_play(tokens)
+            if value > best_value:
+                best_value, best_play = value, play
+        return best_value, best_play
+
+    def _chance_node(self, depth, probability):
+        """Nœud de hasard avant le lancer du joueur au trait ; valeur pour ce joueur"""
+        player = self.env.current_player
+        if depth == 0 or probability < self.prune_probability:
+            return self._evaluate_position(player)
+        total = 0.0
+        for dice, roll_probability in DICE_ROLLS:
+            if self._deadline is not None and (self._interrupted or time.perf_counter() > self._deadline):
+                raise SearchTimeout()
+            value, _ = self._max_node(dice, depth, probability * roll_probability)
+            total += roll_probability * value
+        return total
 
     def _can_bear_off(self):
         """Vérifie si l'IA peut commencer à sortir ses pions"""
@@ -162,109 +451,150 @@ class BackgammonAI:
         else:
             return all(self.env.board[:19, 1].sum() == 0)
 
-    def train_self_play(self, num_games=1000):
-        """Entraîne l'IA en jouant contre elle-même."""
-        for game in range(num_games):
-            self.env.reset()  # Réinitialise l'environnement pour une nouvelle partie
-            self.game_history = []
-
-            # Boucle principale de la partie
-            while True:
-                dice = self.env.roll_dice()  # Lance les dés pour le tour
-                valid_moves = self.env.valid_moves(dice)  # Obtenir les mouvements valides
-
-                if not valid_moves:  # Si aucun mouvement n'est possible
+    def _play_training_game(self, recorder=None):
+        """
+        Joue une partie d'entraînement contre soi-même ; renvoie True si le Joueur 1 gagne.
+        recorder : game_record.GameRecordWriter optionnel qui reçoit chaque coup de la partie.
+        """
+        self.env.reset()  # Réinitialise l'environnement pour une nouvelle partie
+        self.game_history = []
+        if recorder is not None:
+            recorder.begin_game(self.env.game_seed, (player_type(self),) * 2, weights_hash(self))
+
+        # Boucle principale de la partie
+        while True:
+            dice = self.env.roll_dice()  # Lance les dés pour le tour
+            valid_moves = self.env.valid_moves(dice)  # Obtenir les mouvements valides
+
+            if not valid_moves:  # Si aucun mouvement n'est possible
+                if recorder is not None:
+                    recorder.record(self.env.current_player, dice)
+                self.env.end_turn()
+                continue
+
+            move = self.ai_move(valid_moves, dice)
+            if move:
+                src, dest, die_used = move
+                success, game_over = self.env.step_move(src, dest, die_used)
+                if recorder is not None:
+                    recorder.record(self.env.current_player, dice, move if success else None)
+                if game_over:
+                    break
+                # Coup refusé par step_move (limite de 5 pions) : le joueur passe,
+                # sinon une position où tous ses coups sont refusés bouclerait indéfiniment
+                if not success:
                     self.env.end_turn()
-                    continue
 
-                move = self.ai_move(valid_moves, dice)
-                if move:
-                    src, dest, die_used = move
-                    success, game_over = self.env.step_move(src, dest, die_used)
-                    if game_over:
-                        break
+            # Vérifiez si la partie est terminée
+            if self.env.check_win():
+                break
 
-                # Vérifiez si la partie est terminée
-                if self.env.check_win():
-                    break
+        if recorder is not None:
+            recorder.end_game(self.env.current_player)
+        return self.env.current_player == 0  # Exemple : joueur 1 gagne
 
+    def train_self_play(self, num_games=1000, record_path=None):
+        """
+        Entraîne l'IA en jouant contre elle-même.
+        record_path : fichier où enregistrer les parties (format de game_record.py).
+        """
+        recorder = GameRecordWriter(record_path) if record_path else None
+        for game in range(num_games):
+            won = self._play_training_game(recorder)
             # Entraînement après chaque partie
-            won = self.env.current_player == 0  # Exemple : joueur 1 gagne
             self.learn_from_game(won)
+        if recorder is not None:
+            recorder.close()
 
         # Sauvegarde les poids après l'entraînement
         self._save_weights()
         print(f"Entraînement terminé : {num_games} parties simulées.")
 
-class BackgammonGUI_AI(BackgammonGUI):
-    def __init__(self, env=None):
-        if env is None:
-            env = BackgammonEnv()
-        super().__init__(env)
-        self.ai = BackgammonAI(self.env)
-        self.root.title("Backgammon - Joueur vs IA")
-
-    def roll_dice(self):
-        """Lance les dés et démarre le tour de l'IA si c'est son tour"""
-        super().roll_dice()
-        if self.env.current_player == 1:
-            self.root.after(500, self.ai_turn)
-
-    def ai_turn(self):
-        if not self.remaining_dice:
-            return
-
-        def play_next_move():
-            if not self.remaining_dice or not self.valid_moves:
-                self.pass_turn()
-                return
-
-            move = self.ai.ai_move(self.valid_moves, self.remaining_dice)
-            if not move:
-                self.pass_turn()
-                return
-
-            src, dest, die_used = move
-            subset = find_subset(self.remaining_dice, die_used)
-            if not subset:
-                self.pass_turn()
-                return
-
-            for d in subset:
-                self.remaining_dice.remove(d)
-
-            success, win = self.env.step_move(src, dest, die_used)
-            if success:
-                self.info_label.config(text=f"L'IA a joué : {src} → {dest} (Dé utilisé : {die_used})")
-                self.update_history()
-                self.update_valid_moves()
-                self.redraw()
-
-                if win:
-                    # Récupérer le nombre de coups joués
-                    moves_count = len(self.env.move_history) if hasattr(self.env, 'move_history') else 0
-                    
-                    # Enregistrer la victoire avec le nombre de coups
-                    self.game_stats.add_win(2, moves_count)  # L'IA est joueur 2
-                    
-                    self.ai.learn_from_game(won=True)  # L'IA a gagné
-                    messagebox.showinfo("Victoire", f"L'IA a gagné en {moves_count} coups !")
-                    self.root.quit()
-                    return
-
-            # Ajouter un délai avant le prochain coup
-            self.root.after(1000, play_next_move)
-
-        # Démarrer la séquence de coups
-        play_next_move()
-
-    def on_canvas_click(self, event):
-        if self.env.current_player == 1:  # Ignore les clics pendant le tour de l'IA
-            return
-        super().on_canvas_click(event)
+    def train_self_play_parallel(self, num_games=1000, workers=None, batch_size=100,
+                                 sync_interval=1000, seed=None):
+        """
+        Entraîne l'IA en répartissant les parties sur un pool de processus.
+        - Chaque lot de batch_size parties est joué par un processus avec sa propre
+          graine (issue de SeedSequence(seed)) et les poids synchronisés du moment.
+        - Les processus renvoient les ajustements de poids de chaque partie ; ils sont
+          appliqués et sauvegardés toutes les sync_interval parties, et les lots
+          suivants partent avec les nouveaux poids.
+        """
+        # Import local : multiprocessing n'est chargé que pour l'entraînement parallèle
+        from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+        workers = workers or os.cpu_count() or 1
+        seeds = np.random.SeedSequence(seed)
+        submitted = 0
+        since_sync = 0
+        accumulated = {}
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+
+            def fill():
+                nonlocal submitted
+                # Deux lots en vol par processus pour ne jamais laisser un cœur inactif
+                while submitted < num_games and len(pending) < 2 * workers:
+                    size = min(batch_size, num_games - submitted)
+                    pending.add(pool.submit(_self_play_worker, dict(self.weights),
+                                            self.learning_rate, size, seeds.spawn(1)[0]))
+                    submitted += size
+
+            fill()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for deltas in future.result():
+                        for move_type, delta in deltas.items():
+                            accumulated[move_type] = accumulated.get(move_type, 0.0) + delta
+                        since_sync += 1
+                if since_sync >= sync_interval:
+                    self._apply_deltas(accumulated)
+                    self._save_weights()
+                    accumulated, since_sync = {}, 0
+                fill()
+
+        self._apply_deltas(accumulated)
+        self._save_weights()
+        print(f"Entraînement parallèle terminé : {num_games} parties simulées sur {workers} processus.")
+
+
+# Fonctions effectivement appelées par ai_move selon le mode (heuristique, réseau, recherche)
+profiling.instrument(BackgammonAI, {
+    "ai_move": "ai_move",
+    "_score_moves": "_score_moves",
+    "_best_bearoff_play": "_best_bearoff_play",
+    "search_play": "search_play",
+    "anytime_play": "anytime_play",
+    "_evaluate_position": "_evaluate_position",
+    "learn_from_game": "learn_from_game",
+})
+profiling.instrument(TDNetwork, {"best_play": "network.best_play"})
+
+
+def _self_play_worker(weights, learning_rate, num_games, seed):
+    """Joue un lot de parties d'entraînement dans un processus fils ; renvoie les ajustements de chaque partie"""
+    env = BackgammonEnv(record_history=False, seed=seed)
+    ai = BackgammonAI(env)
+    ai.weights = weights
+    ai.learning_rate = learning_rate
+    results = []
+    for _ in range(num_games):
+        won = ai._play_training_game()
+        results.append(ai._weight_deltas(won))
+    return results
+
+
+def __getattr__(name):
+    # L'interface est importée à la demande : importer ce module reste possible sans tkinter ni matplotlib
+    if name == "BackgammonGUI_AI":
+        from backgammon_gui_ai import BackgammonGUI_AI
+        return BackgammonGUI_AI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == '__main__':
-    env = BackgammonEnv()
+    env = BackgammonEnv(record_history=False)
     ai = BackgammonAI(env)
 
     ai.train_self_play(num_games=10000000)
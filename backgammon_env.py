@@ -1,37 +1,205 @@
 import numpy as np
-import pandas as pd
 from itertools import combinations
+import profiling
+
+# Taille en octets d'une clé de position (voir BackgammonEnv.position_key)
+POSITION_KEY_SIZE = 53
+
+# Colonnes de la vue DataFrame de l'historique des coups
+HISTORY_COLUMNS = ["Joueur", "Départ", "Arrivée", "Dé utilisé"]
+
+# Code utilisé dans le journal des coups pour une source "bar"
+BAR_CODE = -1
+
+# Générateurs de coups disponibles pour valid_moves (résultats identiques)
+MOVE_GENERATORS = ("boucles", "tables")
+
+# Borne (exclue) des graines de partie : tient dans l'entier signé 64 bits des enregistrements
+GAME_SEED_LIMIT = 2 ** 63
+
+ALL_POINTS = (1 << 24) - 1
+
+
+def _build_move_tables():
+    """
+    Tables précalculées par joueur et par dé pour le générateur "tables" :
+    - SOURCE_MASKS[j][d] : points (bit i = point i + 1) d'où un pion de j reste sur le plateau avec le dé d
+    - BOARD_MOVES[j][d][i] : coup (source, destination, dé) depuis l'indice i avec le dé d
+    - BEAROFF_MOVES[j][d][i] : coup de sortie depuis l'indice i avec le dé d
+    - ENTRY_MOVES[j][d] : coup de réintroduction depuis la barre avec le dé d
+    - EXACT_BEAROFF[j][d] : indice du point d'où le dé d sort un pion exactement
+    """
+    source_masks = [[0] * 7, [0] * 7]
+    board_moves = [[None] * 7, [None] * 7]
+    bearoff_moves = [[None] * 7, [None] * 7]
+    entry_moves = [[None] * 7, [None] * 7]
+    exact_bearoff = [[None] * 7, [None] * 7]
+    for die in range(1, 7):
+        source_masks[0][die] = ALL_POINTS & ~((1 << die) - 1)
+        source_masks[1][die] = (1 << (24 - die)) - 1
+        board_moves[0][die] = [(i + 1, i + 1 - die, die) for i in range(24)]
+        board_moves[1][die] = [(i + 1, i + 1 + die, die) for i in range(24)]
+        bearoff_moves[0][die] = [(i + 1, 0, die) for i in range(24)]
+        bearoff_moves[1][die] = [(i + 1, 25, die) for i in range(24)]
+        entry_moves[0][die] = ("bar", 25 - die, die)
+        entry_moves[1][die] = ("bar", die, die)
+        exact_bearoff[0][die] = die - 1
+        exact_bearoff[1][die] = 24 - die
+    return source_masks, board_moves, bearoff_moves, entry_moves, exact_bearoff
+
+
+SOURCE_MASKS, BOARD_MOVES, BEAROFF_MOVES, ENTRY_MOVES, EXACT_BEAROFF = _build_move_tables()
+
+
+class MoveLog:
+    """
+    Journal des coups en ajout seul, stocké dans un tableau NumPy préalloué
+    de lignes (joueur, départ, arrivée, dé utilisé). La capacité double quand
+    le tableau est plein, ce qui rend chaque ajout O(1) amorti.
+    """
+
+    def __init__(self, capacity=256):
+        self._records = np.zeros((capacity, 4), dtype=np.int8)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def append(self, joueur, depart, arrivee, de_utilise):
+        if self._size == len(self._records):
+            grown = np.zeros((2 * len(self._records), 4), dtype=np.int8)
+            grown[:self._size] = self._records[:self._size]
+            self._records = grown
+        self._records[self._size] = (joueur, BAR_CODE if depart == "bar" else depart, arrivee, de_utilise)
+        self._size += 1
+
+    def clear(self):
+        self._size = 0
+
+    def records(self):
+        """Vue (sans copie) sur les coups enregistrés, de forme (n, 4)."""
+        return self._records[:self._size]
+
+    def to_dataframe(self):
+        """Construit la vue DataFrame de l'historique (colonnes HISTORY_COLUMNS)."""
+        import pandas as pd  # importé à la demande : le moteur seul n'a pas besoin de pandas
+        rows = [[f"Joueur {joueur + 1}", "bar" if depart == BAR_CODE else depart, arrivee, de]
+                for joueur, depart, arrivee, de in self.records().tolist()]
+        return pd.DataFrame(rows, columns=HISTORY_COLUMNS)
+
 
 class BackgammonEnv:
-    def __init__(self):
-        self.board = np.zeros((24, 2), dtype=int)
-        self.historique = pd.DataFrame(columns=["Joueur", "Départ", "Arrivée", "Dé utilisé"])
+    def __init__(self, record_history=True, seed=None, move_generator="boucles"):
+        self.board = np.zeros((24, 2), dtype=np.int8)
+        # Générateur propre à l'environnement (graine fixe = suite de parties reproductible) :
+        # il ne sert qu'à tirer la graine de chaque partie (game_seed), dont reset() initialise
+        # le générateur des dés (rng). Les lancers d'une partie n'influent pas sur les suivantes.
+        self.seed = seed
+        self._seed_rng = np.random.default_rng(seed)
+        self.rng = None
+        self.game_seed = None
+        # En entraînement headless, record_history=False désactive tout enregistrement des coups
+        self.record_history = record_history
+        self.move_log = MoveLog()
+        self._historique_cache = None
         self.bar = [0, 0]
         self.current_player = 0  # 0 pour Joueur 1, 1 pour Joueur 2
+        self.set_move_generator(move_generator)
         self.reset()
+
+    def set_move_generator(self, name):
+        """
+        Choisit l'implémentation de valid_moves (voir MOVE_GENERATORS) :
+        - "boucles" : parcours des 24 points pour chaque dé
+        - "tables" : tables de destinations précalculées et masques de bits d'occupation
+        """
+        if name not in MOVE_GENERATORS:
+            raise ValueError(f"Générateur de coups inconnu : {name}")
+        self.move_generator = name
+        self._use_tables = name == "tables"
+
+    def valid_moves(self, dice):
+        """
+        Coups simples (source, destination, dé) jouables avec `dice`, triés, sans doublon.
+        Aiguille vers le générateur choisi à l'appel : les générateurs restent des méthodes
+        de la classe, que le profilage peut instrumenter même pour un environnement existant.
+        """
+        if self._use_tables:
+            return self._valid_moves_tables(dice)
+        return self._valid_moves_loops(dice)
     
+    @property
+    def historique(self):
+        """Historique des coups sous forme de DataFrame, construit à la demande depuis le journal."""
+        if self._historique_cache is None or len(self._historique_cache) != len(self.move_log):
+            self._historique_cache = self.move_log.to_dataframe()
+        return self._historique_cache
+
     def end_turn(self):
         """Change le joueur courant, pour le self_train_ai"""
         self.current_player = 1 - self.current_player  # Alterne entre 0 (Joueur 1) et 1 (Joueur 2)
 
-    def reset(self):
+    def reset(self, seed=None):
+        """
+        Commence une partie. Ses dés sont tirés d'un générateur initialisé par
+        game_seed, entier de [0, 2**63) tiré du générateur de graines de
+        l'environnement, ou `seed` s'il est donné : reset(seed=game_seed) rejoue les mêmes dés.
+        """
+        if seed is None:
+            seed = int(self._seed_rng.integers(GAME_SEED_LIMIT))
+        self.game_seed = seed
+        self.rng = np.random.default_rng(seed)
         # Configuration standard simplifiée
-        self.board = np.zeros((24, 2), dtype=int)
+        self.board = np.zeros((24, 2), dtype=np.int8)
         self.board[23, 0], self.board[12, 0], self.board[7, 0], self.board[5, 0] = 2, 5, 3, 5
         self.board[0, 1], self.board[11, 1], self.board[16, 1], self.board[18, 1] = 2, 5, 3, 5
         self.bar = [0, 0]
         self.current_player = 0
-        self.historique = self.historique.iloc[0:0]
+        self.move_log.clear()
+        self._historique_cache = None
+        self._recompute_derived()
         return self.board.copy()
 
+    def _recompute_derived(self):
+        """
+        Recalcule entièrement l'état dérivé, maintenu ensuite de façon incrémentale par apply/undo :
+        - pips[j] : nombre de points (pips) restant à parcourir au joueur j (barre = 25)
+        - outside_home[j] : pions du joueur j hors de son jan intérieur (barre comprise)
+        - off[j] : pions sortis par le joueur j
+        - furthest_back[j] : distance à la sortie du pion le plus en arrière (25 = barre, 0 = aucun pion)
+        - occupied[j], made[j] : masques de bits des points (bit i = point i + 1) portant
+          au moins un pion / au moins deux pions de j
+        Toute modification du plateau doit passer par apply/undo, reset ou set_position_key.
+        """
+        white, red = self.board[:, 0].astype(int), self.board[:, 1].astype(int)
+        distances = np.arange(1, 25)
+        self.pips = [int(white @ distances) + 25 * self.bar[0],
+                     int(red @ distances[::-1]) + 25 * self.bar[1]]
+        self.outside_home = [int(white[6:].sum()) + self.bar[0], int(red[:18].sum()) + self.bar[1]]
+        self.off = [15 - int(white.sum()) - self.bar[0], 15 - int(red.sum()) - self.bar[1]]
+        self.furthest_back = [self._scan_furthest_back(0), self._scan_furthest_back(1)]
+        bits = 1 << np.arange(24, dtype=np.int64)
+        self.occupied = [int(bits @ (white > 0)), int(bits @ (red > 0))]
+        self.made = [int(bits @ (white >= 2)), int(bits @ (red >= 2))]
+
+    def _scan_furthest_back(self, player, start=25):
+        """Distance du pion le plus en arrière de `player`, en cherchant à partir de la distance `start`"""
+        if self.bar[player]:
+            return 25
+        for distance in range(min(start, 24), 0, -1):
+            point_idx = distance - 1 if player == 0 else 24 - distance
+            if self.board[point_idx, player]:
+                return distance
+        return 0
+
     def roll_dice(self):
-        dice = np.random.randint(1, 7, 2)
+        dice = self.rng.integers(1, 7, 2)
         # Gestion des doubles : si c'est un double, on retourne 4 fois la même valeur
         if dice[0] == dice[1]:
             return [int(dice[0])] * 4
         return [int(d) for d in dice]
 
-    def valid_moves(self, dice):
+    def _valid_moves_loops(self, dice):
         """
         Renvoie la liste des mouvements valides possibles, sous forme de tuples (source, destination, dé utilisé).
         Les numéros de cases sont en 1-indexé (1 à 24).
@@ -56,22 +224,10 @@ class BackgammonEnv:
                     if 1 <= point <= 6:  # Vérifier que le point est dans la plage valide
                         if self.board[point - 1, 0] < 2:  # Vérifier que le point n'est pas bloqué par l'adversaire
                             moves.append(("bar", point, die))
-            return list(set(moves))
+            return sorted(set(moves))
         
         # Vérifier si tous les pions du joueur sont dans son home board pour le bearing off
-        can_bear_off = True
-        if self.current_player == 0:  # Joueur 1 (blanc)
-            # Vérifier qu'il n'y a pas de pions dans les points 7-24
-            for i in range(6, 24):
-                if self.board[i, 0] > 0:
-                    can_bear_off = False
-                    break
-        else:  # Joueur 2 (rouge)
-            # Vérifier qu'il n'y a pas de pions dans les points 1-18
-            for i in range(0, 18):
-                if self.board[i, 1] > 0:
-                    can_bear_off = False
-                    break
+        can_bear_off = self.outside_home[self.current_player] == 0
         
         for point in range(24):
             src = point + 1
@@ -87,13 +243,8 @@ class BackgammonEnv:
                             moves.append((src, 0, die))
                         # Si le dé est plus grand que nécessaire, on vérifie qu'il n'y a pas de pions plus loin
                         elif die > src:
-                            # Vérifier qu'il n'y a pas de pions sur des points plus élevés
-                            has_higher_points = False
-                            for i in range(point + 1, 6):  # Vérifier les points plus hauts dans le home board
-                                if self.board[i, 0] > 0:
-                                    has_higher_points = True
-                                    break
-                            if not has_higher_points:
+                            # Pas de pions sur des points plus élevés : src est le pion le plus en arrière
+                            if self.furthest_back[0] == src:
                                 moves.append((src, 0, die))
             elif self.current_player == 1 and self.board[point, 1] > 0:
                 for die in dice:
@@ -107,19 +258,71 @@ class BackgammonEnv:
                             moves.append((src, 25, die))
                         # Si le dé est plus grand que nécessaire, on vérifie qu'il n'y a pas de pions plus loin
                         elif die > (25 - src):
-                            # Vérifier qu'il n'y a pas de pions sur des points inférieurs
-                            has_lower_points = False
-                            for i in range(18, point):  # Vérifier les points plus bas dans le home board
-                                if self.board[i, 1] > 0:
-                                    has_lower_points = True
-                                    break
-                            if not has_lower_points:
+                            # Pas de pions sur des points inférieurs : src est le pion le plus en arrière
+                            if self.furthest_back[1] == 25 - src:
                                 moves.append((src, 25, die))
         
         moves = list(set(moves))
         moves.sort(key=lambda x: (x[0], x[1], x[2]))
         return moves
 
+    def _valid_moves_tables(self, dice):
+        """
+        Même résultat que _valid_moves_loops, calculé par opérations sur les masques de bits :
+        pour chaque dé, les sources jouables sont les points occupés dont la destination
+        (décalage du masque des points adverses faits) n'est pas bloquée.
+        Les coups sont lus dans des tables précalculées et produits directement dans
+        l'ordre trié (source, destination, dé), sans ensemble ni tri.
+        """
+        player = self.current_player
+        blocked = self.made[1 - player]
+        # Pour une même source, trier par destination revient à prendre les dés par ordre
+        # décroissant pour le Joueur 1 (destination src - dé) et croissant pour le Joueur 2
+        dice = sorted(set(dice), reverse=(player == 0))
+        if self.bar[player] > 0:
+            entries = ENTRY_MOVES[player]
+            return [entries[die] for die in dice if not blocked >> (entries[die][1] - 1) & 1]
+
+        own = self.occupied[player]
+        per_die = []
+        sources = 0
+        for die in dice:
+            if player == 0:
+                mask = own & SOURCE_MASKS[0][die] & ~(blocked << die)
+            else:
+                mask = own & SOURCE_MASKS[1][die] & ~(blocked >> die)
+            if mask:
+                per_die.append((mask, BOARD_MOVES[player][die]))
+                sources |= mask
+
+        bearoff = {}
+        if self.outside_home[player] == 0:
+            furthest = self.furthest_back[player]
+            for die in sorted(dice):
+                index = EXACT_BEAROFF[player][die]
+                if not own >> index & 1:
+                    if not 0 < furthest < die:
+                        continue
+                    # Dé plus fort que nécessaire : seul le pion le plus en arrière peut sortir
+                    index = furthest - 1 if player == 0 else 24 - furthest
+                bearoff.setdefault(index, []).append(BEAROFF_MOVES[player][die][index])
+                sources |= 1 << index
+
+        moves = []
+        while sources:
+            low = sources & -sources
+            sources ^= low
+            index = low.bit_length() - 1
+            exits = bearoff.get(index)
+            if exits and player == 0:  # destination 0 : avant les autres coups de la source
+                moves.extend(exits)
+            for mask, table in per_die:
+                if mask & low:
+                    moves.append(table[index])
+            if exits and player == 1:  # destination 25 : après les autres coups de la source
+                moves.extend(exits)
+        return moves
+
     def step_move(self, src_input, dest_input, die_used):
         """
         Exécute un mouvement donné par le joueur.
@@ -129,109 +332,243 @@ class BackgammonEnv:
         Le paramètre 'die_used' correspond à la valeur utilisée (simple ou combinée).
         Renvoie (succès, fin_de_partie)
         """
+        # Toutes les vérifications sont faites avant de toucher au plateau :
+        # un coup refusé laisse l'état strictement inchangé.
+        if not self._is_move_allowed(src_input, dest_input, die_used):
+            return False, False
+        self.apply((src_input, dest_input, die_used))
+        self.enregistrer_coup(self.current_player, src_input, dest_input, die_used)
+        if self.check_win():
+            return True, True
+        return True, False
+
+    def _is_move_allowed(self, src_input, dest_input, die_used):
+        """Vérifications faites par step_move avant d'appliquer un coup."""
+        player = self.current_player
+        opponent = 1 - player
+
         # Gestion des coups venant de la barre
         if src_input == "bar":
-            # Réintroduction depuis la barre
-            if self.current_player == 0:
-                dest_idx = dest_input - 1
-                if self.board[dest_idx, 1] == 1:
-                    self.board[dest_idx, 1] = 0
-                    self.bar[1] += 1
-                elif self.board[dest_idx, 1] >= 2:
-                    return False, False
-                if self.board[dest_idx, 0] >= 5:  # Vérification de la limite de 5 pions
-                    return False, False
-                self.bar[0] -= 1
-                self.board[dest_idx, 0] += 1
-            else:
-                dest_idx = dest_input - 1
-                if self.board[dest_idx, 0] == 1:
-                    self.board[dest_idx, 0] = 0
-                    self.bar[0] += 1
-                elif self.board[dest_idx, 0] >= 2:
-                    return False, False
-                if self.board[dest_idx, 1] >= 5:  # Vérification de la limite de 5 pions
-                    return False, False
-                self.bar[1] -= 1
-                self.board[dest_idx, 1] += 1
-            self.enregistrer_coup(self.current_player, "bar", dest_input, die_used)
-            if self.check_win():
-                return True, True
-            return True, False
+            dest_idx = dest_input - 1
+            if self.board[dest_idx, opponent] >= 2:
+                return False
+            if self.board[dest_idx, player] >= 5:  # Vérification de la limite de 5 pions
+                return False
+            return True
+
+        src_idx = src_input - 1
+        if dest_input == (0 if player == 0 else 25):  # bearing off
+            # Vérifier si le joueur peut faire un bearing off
+            if self.outside_home[player] > 0:
+                return False
+            distance = src_input if player == 0 else 25 - src_input
+            # Règle exacte pour le dé (si on a des pions plus loin, on doit utiliser un dé exact)
+            if die_used < distance:
+                return False
+            if die_used > distance and self.furthest_back[player] > distance:
+                return False
+            return True
 
         # Déplacement normal
-        if self.current_player == 0:
-            src_idx = src_input - 1
-            if dest_input == 0:  # bearing off
-                # Vérifier si le joueur peut faire un bearing off
-                can_bear_off = all(self.board[i, 0] == 0 for i in range(6, 24))
-                if not can_bear_off:
-                    return False, False
-                # Règle exacte pour le dé (si on a des pions plus loin, on doit utiliser un dé exact)
-                if die_used < src_input:
-                    return False, False
-                if die_used > src_input:
-                    # Vérifier s'il y a des pions sur des points plus élevés
-                    for i in range(src_idx + 1, 6):
-                        if self.board[i, 0] > 0:
-                            return False, False
-                self.board[src_idx, 0] -= 1
-            else:
-                dest_idx = dest_input - 1
-                if self.board[dest_idx, 1] == 1:
-                    self.board[dest_idx, 1] = 0
-                    self.bar[1] += 1
-                elif self.board[dest_idx, 1] >= 2:
-                    return False, False
-                if self.board[dest_idx, 0] >= 5:  # Vérification de la limite de 5 pions
-                    return False, False
-                if self.board[src_idx, 0] <= 0:
-                    return False, False
-                self.board[src_idx, 0] -= 1
-                self.board[dest_idx, 0] += 1
+        dest_idx = dest_input - 1
+        if self.board[dest_idx, opponent] >= 2:
+            return False
+        if self.board[dest_idx, player] >= 5:  # Vérification de la limite de 5 pions
+            return False
+        if self.board[src_idx, player] <= 0:
+            return False
+        return True
+
+    def apply(self, move):
+        """
+        Applique un coup (source, destination, dé) du joueur courant, sans vérification
+        ni enregistrement dans l'historique, et renvoie un jeton d'annulation.
+        Sert à step_move et aux recherches, qui enchaînent apply/undo au lieu de copier l'environnement.
+        """
+        src, dest = move[0], move[1]
+        player = self.current_player
+        opponent = 1 - player
+        if src == "bar":
+            self.bar[player] -= 1
+            src_distance = 25
         else:
-            src_idx = src_input - 1
-            if dest_input == 25:  # bearing off
-                # Vérifier si le joueur peut faire un bearing off
-                can_bear_off = all(self.board[i, 1] == 0 for i in range(0, 18))
-                if not can_bear_off:
-                    return False, False
-                # Règle exacte pour le dé (si on a des pions plus loin, on doit utiliser un dé exact)
-                if die_used < (25 - src_input):
-                    return False, False
-                if die_used > (25 - src_input):
-                    # Vérifier s'il y a des pions sur des points inférieurs
-                    for i in range(18, src_idx):
-                        if self.board[i, 1] > 0:
-                            return False, False
-                self.board[src_idx, 1] -= 1
-            else:
-                dest_idx = dest_input - 1
-                if self.board[dest_idx, 0] == 1:
-                    self.board[dest_idx, 0] = 0
-                    self.bar[0] += 1
-                elif self.board[dest_idx, 0] >= 2:
-                    return False, False
-                if self.board[dest_idx, 1] >= 5:  # Vérification de la limite de 5 pions
-                    return False, False
-                if self.board[src_idx, 1] <= 0:
-                    return False, False
-                self.board[src_idx, 1] -= 1
-                self.board[dest_idx, 1] += 1
+            self.board[src - 1, player] -= 1
+            src_distance = src if player == 0 else 25 - src
+            self._update_masks(src - 1, player)
+        hit = False
+        if dest != 0 and dest != 25:  # pas un bearing off
+            dest_distance = dest if player == 0 else 25 - dest
+            if self.board[dest - 1, opponent] == 1:
+                hit = True
+                self.board[dest - 1, opponent] = 0
+                self.occupied[opponent] &= ~(1 << (dest - 1))
+                self.bar[opponent] += 1
+                # Le pion frappé repart de la barre
+                self.pips[opponent] += dest_distance
+                if dest_distance >= 19:  # il était dans le jan intérieur adverse
+                    self.outside_home[opponent] += 1
+                self.furthest_back[opponent] = 25
+            self.board[dest - 1, player] += 1
+            self._update_masks(dest - 1, player)
+        else:
+            dest_distance = 0
+            self.off[player] += 1
+        self.pips[player] -= src_distance - dest_distance
+        if src_distance > 6 >= dest_distance:
+            self.outside_home[player] -= 1
+        if src_distance == self.furthest_back[player]:
+            self.furthest_back[player] = self._scan_furthest_back(player, src_distance)
+        return (src, dest, hit, player)
 
-        self.enregistrer_coup(self.current_player, src_input, dest_input, die_used)
-        if self.check_win():
-            return True, True
-        return True, False
+    def undo(self, token):
+        """Annule exactement un coup appliqué par apply() : plateau, barre, pion frappé et trait."""
+        src, dest, hit, player = token
+        opponent = 1 - player
+        self.current_player = player
+        if dest != 0 and dest != 25:
+            dest_distance = dest if player == 0 else 25 - dest
+            self.board[dest - 1, player] -= 1
+            self._update_masks(dest - 1, player)
+            if hit:
+                self.board[dest - 1, opponent] = 1
+                self.occupied[opponent] |= 1 << (dest - 1)
+                self.bar[opponent] -= 1
+                self.pips[opponent] -= dest_distance
+                if dest_distance >= 19:
+                    self.outside_home[opponent] -= 1
+                self.furthest_back[opponent] = self._scan_furthest_back(opponent)
+        else:
+            dest_distance = 0
+            self.off[player] -= 1
+        if src == "bar":
+            self.bar[player] += 1
+            src_distance = 25
+        else:
+            self.board[src - 1, player] += 1
+            src_distance = src if player == 0 else 25 - src
+            self._update_masks(src - 1, player)
+        self.pips[player] += src_distance - dest_distance
+        if src_distance > 6 >= dest_distance:
+            self.outside_home[player] += 1
+        self.furthest_back[player] = max(self.furthest_back[player], src_distance)
+
+    def _update_masks(self, index, player):
+        """Met à jour les bits du point `index` dans occupied/made après un changement d'un pion de `player`"""
+        count = self.board[index, player]
+        bit = 1 << index
+        if count:
+            self.occupied[player] |= bit
+        else:
+            self.occupied[player] &= ~bit
+        if count >= 2:
+            self.made[player] |= bit
+        else:
+            self.made[player] &= ~bit
+
+    def position_key(self):
+        """
+        Renvoie une clé canonique et hachable (bytes, 53 octets) de la position :
+        - 48 octets : nombre de pions de chaque joueur sur les points 1 à 24
+        - 2 octets : pions sur la barre (Joueur 1, Joueur 2)
+        - 2 octets : pions sortis (Joueur 1, Joueur 2)
+        - 1 octet : joueur qui a le trait
+        Le plateau étant stocké en int8, la clé est lue directement sans copie intermédiaire.
+        """
+        return self.board.tobytes() + bytes((self.bar[0], self.bar[1], self.off[0], self.off[1],
+                                             self.current_player))
+
+    def set_position_key(self, key):
+        """Restaure la position décrite par une clé produite par position_key()."""
+        if len(key) != POSITION_KEY_SIZE:
+            raise ValueError(f"Clé de position invalide ({len(key)} octets au lieu de {POSITION_KEY_SIZE})")
+        self.board = np.frombuffer(key, dtype=np.int8, count=48).reshape(24, 2).copy()
+        self.bar = [key[48], key[49]]
+        self.current_player = key[52]
+        self._recompute_derived()
+
+    @classmethod
+    def from_position_key(cls, key):
+        """Crée un environnement placé dans la position décrite par la clé."""
+        env = cls()
+        env.set_position_key(key)
+        return env
+
+    def _playable_moves(self, die):
+        """Coups simples jouables avec un dé, en respectant la limite de 5 pions par point."""
+        player = self.current_player
+        off = 0 if player == 0 else 25
+        return [m for m in self.valid_moves([die])
+                if m[1] == off or self.board[m[1] - 1, player] < 5]
+
+    def legal_plays(self, dice):
+        """
+        Renvoie toutes les séquences complètes jouables pour un lancer (doubles compris).
+        Chaque séquence est un tuple de coups (source, destination, dé utilisé).
+        - Les séquences menant à la même position sont fusionnées en une seule.
+        - Il faut utiliser le plus de dés possible ; si un seul dé peut être joué,
+          le plus fort est obligatoire quand il est jouable.
+        Si aucun coup n'est jouable, renvoie une liste vide.
+        L'état de l'environnement est restauré à l'identique en sortie.
+        """
+        leaves = []
+        seen = set()
+
+        def explore(remaining, sequence):
+            # Deux chemins menant à la même position avec les mêmes dés restants
+            # ont exactement les mêmes suites : on n'explore la position qu'une fois.
+            node = (self.position_key(), remaining)
+            if node in seen:
+                return
+            seen.add(node)
+            extended = False
+            for die in sorted(set(remaining), reverse=True):
+                rest = list(remaining)
+                rest.remove(die)
+                rest = tuple(rest)
+                for move in self._playable_moves(die):
+                    token = self.apply(move)
+                    explore(rest, sequence + (move,))
+                    self.undo(token)
+                    extended = True
+            if not extended and sequence:
+                leaves.append((node[0], sequence))
+
+        explore(tuple(sorted(dice, reverse=True)), ())
+
+        if not leaves:
+            return []
+
+        # Règle d'utilisation maximale des dés
+        max_len = max(len(seq) for _, seq in leaves)
+        leaves = [(key, seq) for key, seq in leaves if len(seq) == max_len]
+        if max_len == 1 and len(dice) == 2 and dice[0] != dice[1]:
+            bigger = max(dice)
+            with_bigger = [(key, seq) for key, seq in leaves if seq[0][2] == bigger]
+            if with_bigger:
+                leaves = with_bigger
+
+        # Fusion des séquences aboutissant à la même position
+        plays = {}
+        for key, seq in leaves:
+            plays.setdefault(key, seq)
+        return list(plays.values())
 
     def check_win(self):
         # Un joueur gagne s'il n'a plus de pions sur le plateau
-        return np.sum(self.board[:, self.current_player]) == 0
+        return self.off[self.current_player] == 15
 
     def enregistrer_coup(self, joueur, depart, arrivee, de_utilise):
-        new_entry = pd.DataFrame([[f"Joueur {joueur + 1}", depart, arrivee, de_utilise]],
-                                 columns=self.historique.columns)
-        self.historique = pd.concat([self.historique, new_entry], ignore_index=True)
+        if self.record_history:
+            self.move_log.append(joueur, depart, arrivee, de_utilise)
+
+
+profiling.instrument(BackgammonEnv, {
+    "_valid_moves_loops": "valid_moves",
+    "_valid_moves_tables": "valid_moves",
+    "legal_plays": "legal_plays",
+    "step_move": "step_move",
+})
+
 
 def find_subset(remaining, target):
     """
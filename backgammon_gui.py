@@ -3,6 +3,7 @@ from tkinter import messagebox, scrolledtext
 from itertools import chain
 from backgammon_env import BackgammonEnv
 from game_statistics import GameStatistics
+from game_record import GameRecordWriter, GAME_RECORDS_FILE
 
 # --- Paramètres généraux du canvas ---
 CANVAS_WIDTH  = 880
@@ -89,10 +90,11 @@ def get_triangle_for_point(point):
         raise ValueError("Point doit être entre 1 et 24")
     return {"x1": x1, "x2": x2, "base_y": base_y, "tip_y": tip_y, "is_bottom": is_bottom, "ordre": ordre}
 
-def draw_triangle(canvas, point, highlight=False):
+def draw_triangle(canvas, point, highlight=False, tags=()):
     """
     Dessine le triangle pour le point donné et affiche son numéro.
-    Si highlight est True, le triangle est surligné.
+    Le contour de surlignage est toujours créé (tag "highlight<point>") : il est
+    visible si highlight est True, caché sinon, et se bascule ensuite avec set_highlight.
     Renvoie (center_x, coords, bbox) où bbox est le rectangle approximatif du triangle.
     """
     coords = get_triangle_for_point(point)
@@ -100,26 +102,31 @@ def draw_triangle(canvas, point, highlight=False):
     base_y, tip_y = coords["base_y"], coords["tip_y"]
     is_bottom = coords["is_bottom"]
     ordre = coords["ordre"]
+    tags = (f"point{point}",) + tuple(tags)
     
     pts = [x1, base_y, x2, base_y, (x1+x2)/2, tip_y]
     color = TRIANGLE_RED if (ordre % 2 == 0) else TRIANGLE_WHITE
-    canvas.create_polygon(pts, fill=color, outline="black")
+    canvas.create_polygon(pts, fill=color, outline="black", tags=tags)
     
     center_x = (x1 + x2) / 2
     if is_bottom:
         text_y = base_y - 15
     else:
         text_y = base_y + 15
-    canvas.create_text(center_x, text_y, text=str(point), fill="black", font=("Arial", 12, "bold"))
+    canvas.create_text(center_x, text_y, text=str(point), fill="black", font=("Arial", 12, "bold"), tags=tags)
     
-    if highlight:
-        canvas.create_polygon(pts, fill="", outline=HIGHLIGHT_COLOR, width=4)
+    canvas.create_polygon(pts, fill="", outline=HIGHLIGHT_COLOR, width=4,
+                          state="normal" if highlight else "hidden", tags=tags + (f"highlight{point}",))
     
     bbox = (min(x1, (x1+x2)/2), min(base_y, tip_y),
             max(x2, (x1+x2)/2), max(base_y, tip_y))
     return center_x, coords, bbox
 
-def draw_checkers(canvas, center_x, coords, count, player_color, offset=0):
+def set_highlight(canvas, point, highlight):
+    """Affiche ou cache le contour de surlignage d'un point dessiné par draw_triangle"""
+    canvas.itemconfigure(f"highlight{point}", state="normal" if highlight else "hidden")
+
+def draw_checkers(canvas, center_x, coords, count, player_color, offset=0, tags=()):
     """
     Dessine les pions sur le triangle.
     Les pions sont empilés depuis le bord long du triangle.
@@ -140,109 +147,181 @@ def draw_checkers(canvas, center_x, coords, count, player_color, offset=0):
         y = start_y + i * dy
         canvas.create_oval(center_x + offset - CHECKER_RADIUS, y - CHECKER_RADIUS,
                            center_x + offset + CHECKER_RADIUS, y + CHECKER_RADIUS,
-                           fill=player_color, outline="black", width=2)
+                           fill=player_color, outline="black", width=2, tags=tags)
     if count > max_display:
         canvas.create_text(center_x + offset, start_y + num_to_draw * dy,
-                           text=str(count), fill="black", font=("Arial", 14, "bold"))
+                           text=str(count), fill="black", font=("Arial", 14, "bold"), tags=tags)
+
+def draw_point_checkers(canvas, center_x, coords, count_white, count_red, tags=()):
+    """Dessine les pions d'un point : un seul groupe centré, ou les deux groupes côte à côte"""
+    if count_white and not count_red:
+        draw_checkers(canvas, center_x, coords, count_white, PLAYER1_COLOR, tags=tags)
+    elif count_red and not count_white:
+        draw_checkers(canvas, center_x, coords, count_red, PLAYER2_COLOR, tags=tags)
+    elif count_white and count_red:
+        draw_checkers(canvas, center_x - 10, coords, count_white, PLAYER1_COLOR, tags=tags)
+        draw_checkers(canvas, center_x + 10, coords, count_red, PLAYER2_COLOR, tags=tags)
+
+def draw_bar_checkers(canvas, bar_center_x, count_white, count_red, tags=()):
+    """Dessine les pions sur la barre : ceux du joueur 1 en bas, ceux du joueur 2 en haut"""
+    start_y = CANVAS_HEIGHT - CHECKER_RADIUS - 5
+    for i in range(count_white):
+        y = start_y - i * (CHECKER_RADIUS * 2 + 5)
+        canvas.create_oval(bar_center_x - CHECKER_RADIUS, y - CHECKER_RADIUS,
+                           bar_center_x + CHECKER_RADIUS, y + CHECKER_RADIUS,
+                           fill=PLAYER1_COLOR, outline="black", width=2, tags=tags)
+    start_y = CHECKER_RADIUS + 5
+    for i in range(count_red):
+        y = start_y + i * (CHECKER_RADIUS * 2 + 5)
+        canvas.create_oval(bar_center_x - CHECKER_RADIUS, y - CHECKER_RADIUS,
+                           bar_center_x + CHECKER_RADIUS, y + CHECKER_RADIUS,
+                           fill=PLAYER2_COLOR, outline="black", width=2, tags=tags)
+
+class BoardRenderer:
+    """
+    Rendu « retenu » du plateau sur un canvas.
+
+    Le décor (barre, triangles, numéros, zones de sortie, contours de surlignage)
+    est créé une seule fois ; chaque élément porte le tag de son point ("point<i>",
+    "checkers<i>", "highlight<i>", "bar", "off0"/"off25"). À chaque rendu, le
+    renderer compare l'état affiché (pions de chaque point, surlignage, barre,
+    pions sortis) à celui de l'environnement et ne touche qu'aux points qui ont
+    changé : les pions d'un point modifié sont recréés, un surlignage est basculé
+    par itemconfigure, un compteur de sortie par changement de texte.
+
+    invalidate() oublie l'état affiché : le rendu suivant redessine tout.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.triangles_bbox = {}
+        self.bearing_off_boxes = {}
+        self.invalidate()
+
+    def invalidate(self):
+        self.canvas.delete("all")
+        self._built = False
+        self._points = {}   # point -> (pions blancs, pions rouges) affichés
+        self._highlights = {}  # point (1-24, 0 ou 25) -> surligné ou non
+        self._bar = None
+        self._off = None
+
+    def _build(self):
+        canvas = self.canvas
+        canvas.config(bg=BOARD_BG_COLOR)
+
+        # Bar central
+        bar_x1 = (CANVAS_WIDTH - BAR_WIDTH - 80) / 2  # Ajustement pour le nouveau width
+        bar_x2 = bar_x1 + BAR_WIDTH
+        canvas.create_rectangle(bar_x1, 0, bar_x2, CANVAS_HEIGHT, fill=BAR_COLOR, outline=BAR_COLOR)
+        self._bar_center_x = (bar_x1 + bar_x2) / 2
+
+        # Ligne délimitant le plateau principal des zones de bearing off
+        plateau_width = CANVAS_WIDTH - 80  # Largeur du plateau sans les zones bearing off
+        canvas.create_line(plateau_width, 0, plateau_width, CANVAS_HEIGHT, fill="black", width=2)
+
+        for point in range(1, 25):
+            center_x, coords, bbox = draw_triangle(canvas, point)
+            self.triangles_bbox[point] = {"coords": coords, "center_x": center_x, "bbox": bbox}
+            self._highlights[point] = False
+
+        # Zones de bearing off clairement séparées du plateau
+        off_height = 80
+
+        # Joueur 1 (blanc) : sortie en bas à droite
+        off_x1 = plateau_width + 5
+        off_y1 = CANVAS_HEIGHT - off_height - 10
+        off_x2 = CANVAS_WIDTH - 5
+        off_y2 = CANVAS_HEIGHT - 10
+        canvas.create_rectangle(off_x1, off_y1, off_x2, off_y2,
+                                fill="#EAEAEA", outline="black", width=3, tags=("off0", "box0"))
+        canvas.create_text((off_x1 + off_x2)/2, (off_y1 + off_y2)/2,
+                           text="0", font=("Arial", 20, "bold"), tags=("off0", "count0"))
+        canvas.create_text((off_x1 + off_x2)/2, off_y1 - 15,
+                           text="Sortie J1", font=("Arial", 12, "bold"), tags=("off0",))
+
+        # Joueur 2 (rouge) : sortie en haut à droite
+        off_x1_2 = plateau_width + 5
+        off_y1_2 = 10
+        off_x2_2 = CANVAS_WIDTH - 5
+        off_y2_2 = 10 + off_height
+        canvas.create_rectangle(off_x1_2, off_y1_2, off_x2_2, off_y2_2,
+                                fill="#FFCCCB", outline="black", width=3, tags=("off25", "box25"))
+        canvas.create_text((off_x1_2 + off_x2_2)/2, (off_y1_2 + off_y2_2)/2,
+                           text="0", font=("Arial", 20, "bold"), tags=("off25", "count25"))
+        canvas.create_text((off_x1_2 + off_x2_2)/2, off_y2_2 + 15,
+                           text="Sortie J2", font=("Arial", 12, "bold"), tags=("off25",))
+        self._highlights[0] = self._highlights[25] = False
+
+        # Coordonnées des bearing off boxes
+        self.bearing_off_boxes = {
+            0: (off_x1, off_y1, off_x2, off_y2),
+            25: (off_x1_2, off_y1_2, off_x2_2, off_y2_2)
+        }
+        self._built = True
+
+    def render(self, env, selected_point=None, valid_destinations=None):
+        """
+        Met le canvas en accord avec env.board, en ne modifiant que ce qui a changé.
+        Renvoie (triangles_bbox, bearing_off_boxes), comme draw_board.
+        """
+        if not self._built:
+            self._build()
+        canvas = self.canvas
+        destinations = set(valid_destinations or ())
+
+        for point in range(1, 25):
+            idx = point - 1
+            counts = (int(env.board[idx, 0]), int(env.board[idx, 1]))
+            if self._points.get(point) != counts:
+                tag = f"checkers{point}"
+                if point in self._points:
+                    canvas.delete(tag)
+                data = self.triangles_bbox[point]
+                draw_point_checkers(canvas, data["center_x"], data["coords"], *counts,
+                                    tags=(f"point{point}", tag))
+                self._points[point] = counts
+            hl = selected_point == point or point in destinations
+            if self._highlights[point] != hl:
+                set_highlight(canvas, point, hl)
+                self._highlights[point] = hl
+
+        # Surlignage des zones de sortie si la destination 0 ou 25 est valide
+        for borne in (0, 25):
+            hl = borne in destinations
+            if self._highlights[borne] != hl:
+                canvas.itemconfigure(f"box{borne}", outline=HIGHLIGHT_COLOR if hl else "black")
+                self._highlights[borne] = hl
+
+        off = tuple(env.off)
+        if off != self._off:
+            canvas.itemconfigure("count0", text=str(off[0]))
+            canvas.itemconfigure("count25", text=str(off[1]))
+            self._off = off
+
+        # Pions sur la barre
+        bar = (int(env.bar[0]), int(env.bar[1]))
+        if bar != self._bar:
+            if self._bar is not None:
+                canvas.delete("bar")
+            draw_bar_checkers(canvas, self._bar_center_x, *bar, tags=("bar",))
+            self._bar = bar
+
+        return self.triangles_bbox, self.bearing_off_boxes
 
 def draw_board(canvas, env, selected_point=None, valid_destinations=None):
     """
     Dessine le plateau complet et les pions d'après env.board.
     Surligne le point sélectionné et/ou les destinations valides si indiqués.
+    Le rendu est incrémental : un BoardRenderer est attaché au canvas au premier
+    appel, les appels suivants ne mettent à jour que les points modifiés.
     Renvoie un dictionnaire des bounding boxes pour chaque point.
     """
-    canvas.delete("all")
-    canvas.config(bg=BOARD_BG_COLOR)
-
-    # Bar central
-    bar_x1 = (CANVAS_WIDTH - BAR_WIDTH - 80) / 2  # Ajustement pour le nouveau width
-    bar_x2 = bar_x1 + BAR_WIDTH
-    canvas.create_rectangle(bar_x1, 0, bar_x2, CANVAS_HEIGHT, fill=BAR_COLOR, outline=BAR_COLOR)
-
-    # Ligne délimitant le plateau principal des zones de bearing off
-    plateau_width = CANVAS_WIDTH - 80  # Largeur du plateau sans les zones bearing off
-    canvas.create_line(plateau_width, 0, plateau_width, CANVAS_HEIGHT, fill="black", width=2)
-
-    triangles_bbox = {}
-    for point in range(1, 25):
-        hl = selected_point == point or (valid_destinations and point in valid_destinations)
-        center_x, coords, bbox = draw_triangle(canvas, point, highlight=hl)
-        triangles_bbox[point] = {"coords": coords, "center_x": center_x, "bbox": bbox}
-        idx = point - 1
-        count_white = int(env.board[idx, 0])
-        count_red = int(env.board[idx, 1])
-        if count_white and not count_red:
-            draw_checkers(canvas, center_x, coords, count_white, PLAYER1_COLOR)
-        elif count_red and not count_white:
-            draw_checkers(canvas, center_x, coords, count_red, PLAYER2_COLOR)
-        elif count_white and count_red:
-            draw_checkers(canvas, center_x - 10, coords, count_white, PLAYER1_COLOR)
-            draw_checkers(canvas, center_x + 10, coords, count_red, PLAYER2_COLOR)
-
-    # Zones de bearing off clairement séparées du plateau
-    off_width, off_height = 70, 80
-    
-    import numpy as np
-    borne_off_j1 = 15 - int(np.sum(env.board[:, 0])) - env.bar[0]
-    borne_off_j2 = 15 - int(np.sum(env.board[:, 1])) - env.bar[1]
-
-    # Joueur 1 (blanc) : sortie en bas à droite
-    off_x1 = plateau_width + 5
-    off_y1 = CANVAS_HEIGHT - off_height - 10
-    off_x2 = CANVAS_WIDTH - 5
-    off_y2 = CANVAS_HEIGHT - 10
-    
-    # Highlight si la destination 0 est valide
-    highlight_color = HIGHLIGHT_COLOR if (valid_destinations and 0 in valid_destinations) else "black"
-    canvas.create_rectangle(off_x1, off_y1, off_x2, off_y2, 
-                           fill="#EAEAEA", outline=highlight_color, width=3)
-    canvas.create_text((off_x1 + off_x2)/2, (off_y1 + off_y2)/2, 
-                      text=str(borne_off_j1), font=("Arial", 20, "bold"))
-    canvas.create_text((off_x1 + off_x2)/2, off_y1 - 15, 
-                      text="Sortie J1", font=("Arial", 12, "bold"))
-
-    # Joueur 2 (rouge) : sortie en haut à droite
-    off_x1_2 = plateau_width + 5
-    off_y1_2 = 10
-    off_x2_2 = CANVAS_WIDTH - 5
-    off_y2_2 = 10 + off_height
-    
-    # Highlight si la destination 25 est valide
-    highlight_color = HIGHLIGHT_COLOR if (valid_destinations and 25 in valid_destinations) else "black"
-    canvas.create_rectangle(off_x1_2, off_y1_2, off_x2_2, off_y2_2, 
-                           fill="#FFCCCB", outline=highlight_color, width=3)
-    canvas.create_text((off_x1_2 + off_x2_2)/2, (off_y1_2 + off_y2_2)/2, 
-                      text=str(borne_off_j2), font=("Arial", 20, "bold"))
-    canvas.create_text((off_x1_2 + off_x2_2)/2, off_y2_2 + 15, 
-                      text="Sortie J2", font=("Arial", 12, "bold"))
-    
-    # Pions sur la barre
-    bar_center_x = (bar_x1 + bar_x2) / 2
-    if env.bar[0] > 0:
-        start_y = CANVAS_HEIGHT - CHECKER_RADIUS - 5
-        for i in range(env.bar[0]):
-            y = start_y - i * (CHECKER_RADIUS * 2 + 5)
-            canvas.create_oval(bar_center_x - CHECKER_RADIUS, y - CHECKER_RADIUS,
-                               bar_center_x + CHECKER_RADIUS, y + CHECKER_RADIUS,
-                               fill=PLAYER1_COLOR, outline="black", width=2)
-    if env.bar[1] > 0:
-        start_y = CHECKER_RADIUS + 5
-        for i in range(env.bar[1]):
-            y = start_y + i * (CHECKER_RADIUS * 2 + 5)
-            canvas.create_oval(bar_center_x - CHECKER_RADIUS, y - CHECKER_RADIUS,
-                               bar_center_x + CHECKER_RADIUS, y + CHECKER_RADIUS,
-                               fill=PLAYER2_COLOR, outline="black", width=2)
-
-    # Stocker les nouvelles coordonnées des bearing off boxes
-    bearing_off_boxes = {
-        0: (off_x1, off_y1, off_x2, off_y2),
-        25: (off_x1_2, off_y1_2, off_x2_2, off_y2_2)
-    }
-
-    # Zone pour la barre
-    bar_bbox = (bar_x1, 0, bar_x2, CANVAS_HEIGHT)
-    
-    return triangles_bbox, bearing_off_boxes  
+    renderer = getattr(canvas, "board_renderer", None)
+    if renderer is None:
+        renderer = canvas.board_renderer = BoardRenderer(canvas)
+    return renderer.render(env, selected_point, valid_destinations)
+
 #------------------------------ACTION BUTTON PART
 class BackgammonGUI:
     def __init__(self, env, ai=None):
@@ -255,6 +334,9 @@ class BackgammonGUI:
         
         # Ajoutez cette ligne pour créer l'instance des statistiques
         self.game_stats = GameStatistics()
+        # Enregistrement binaire des parties (game_record.py)
+        self.recorder = GameRecordWriter(GAME_RECORDS_FILE)
+        self.current_roll = []
         
         # Zone d'information et contrôle
         self.info_label = tk.Label(self.root, text="Cliquez sur 'Lancer les dés' pour commencer.", font=("Arial", 12))
@@ -272,7 +354,7 @@ class BackgammonGUI:
         self.reset_button = tk.Button(self.root, text="Nouvelle partie", command=self.reset_game, font=("Arial", 12))
         self.reset_button.grid(row=3, column=2, pady=5, padx=5)
         
-        self.close_button = tk.Button(self.root, text="Fermer", command=self.root.destroy, font=("Arial", 12))
+        self.close_button = tk.Button(self.root, text="Fermer", command=self.close, font=("Arial", 12))
         self.close_button.grid(row=3, column=3, pady=5, padx=5)
         
         # Zone d'historique des coups
@@ -289,11 +371,23 @@ class BackgammonGUI:
         
         self.triangles_bbox = {}
         self.canvas.bind("<Button-1>", self.on_canvas_click)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.begin_record()
         self.redraw()
 
+    def begin_record(self):
+        """Commence l'enregistrement d'une nouvelle partie"""
+        self.recorder.begin_game(self.env.game_seed, ("humain", "humain"))
+
+    def record_move(self, move=None):
+        """Enregistre un coup du joueur courant avec le lancer du tour (move None : tour passé)"""
+        if self.current_roll:
+            self.recorder.record(self.env.current_player, self.current_roll, move)
+
     def roll_dice(self):
         # Lancer les dés et mettre à jour l'état
         self.remaining_dice = self.env.roll_dice()
+        self.current_roll = list(self.remaining_dice)
         self.info_label.config(text=f"Résultat des dés: {self.remaining_dice}")
         self.dice_label.config(text=f"Dés: {self.remaining_dice}")
         self.update_valid_moves()
@@ -321,6 +415,8 @@ class BackgammonGUI:
     def pass_turn(self):
         # Passer le tour et changer de joueur
         self.info_label.config(text=f"Joueur {self.env.current_player + 1} passe son tour.")
+        if self.remaining_dice and len(self.remaining_dice) == len(self.current_roll):
+            self.record_move()  # aucun dé du lancer n'a été joué
         self.end_turn()
 
     def end_turn(self):
@@ -335,12 +431,14 @@ class BackgammonGUI:
                 moves_count = self.env.turn_count * 2 if hasattr(self.env, 'turn_count') else 10
             
             self.game_stats.add_win(self.env.current_player + 1, moves_count)
+            self.recorder.end_game(self.env.current_player)
             messagebox.showinfo("Fin de partie", f"Félicitations, Joueur {self.env.current_player + 1} a gagné en {moves_count} coups !")
             self.reset_game()
             return
         self.env.current_player = 1 - self.env.current_player
         self.info_label.config(text=f"C'est au tour du Joueur {self.env.current_player + 1}. Cliquez sur 'Lancer les dés'.")
         self.remaining_dice = []
+        self.current_roll = []
         self.dice_label.config(text="Dés: []")
         self.selected_point = None
         self.valid_destinations = []
@@ -417,6 +515,7 @@ class BackgammonGUI:
                 success, win = self.env.step_move(src, dest, die_used)
                 
                 if success:
+                    self.record_move(move)
                     # Enlever le dé utilisé
                     if die_used in self.remaining_dice:
                         self.remaining_dice.remove(die_used)
@@ -455,6 +554,7 @@ class BackgammonGUI:
                         src, dest, die_used = move
                         success, win = self.env.step_move(src, dest, die_used)
                         if success:
+                            self.record_move(move)
                             if die_used in self.remaining_dice:
                                 self.remaining_dice.remove(die_used)
                             else:
@@ -498,6 +598,7 @@ class BackgammonGUI:
                         src, dest, die_used = move
                         success, win = self.env.step_move(src, dest, die_used)
                         if success:
+                            self.record_move(move)
                             if die_used in self.remaining_dice:
                                 self.remaining_dice.remove(die_used)
                             else:
@@ -532,6 +633,8 @@ class BackgammonGUI:
         self.env.reset()
         self.env.current_player = 0
         self.remaining_dice = []
+        self.current_roll = []
+        self.begin_record()
         self.selected_point = None
         self.valid_destinations = []
         self.history_text.config(state="normal")
@@ -542,6 +645,11 @@ class BackgammonGUI:
         self.dice_label.config(text="Dés: []")
         self.redraw()
 
+    def close(self):
+        """Ferme la fenêtre ; une partie en cours est enregistrée comme interrompue"""
+        self.recorder.close()
+        self.root.destroy()
+
     def run(self):
         self.root.mainloop()
 
@@ -0,0 +1,146 @@
+# backgammon_gui_ai.py
+from pathlib import Path
+from tkinter import messagebox
+from backgammon_env import BackgammonEnv, find_subset
+from backgammon_gui import BackgammonGUI
+from backgammon_ai import BackgammonAI
+from ai_worker import AIWorker, POLL_INTERVAL_MS
+from game_record import player_type, weights_hash
+from td_network import TDNetwork, TD_WEIGHTS_FILE
+
+# Budget de réflexion de l'IA par décision (secondes), voir BackgammonAI.anytime_play
+AI_TIME_BUDGET = 1.0
+
+# Intervalle minimal entre deux coups affichés de l'IA (ms), temps de réflexion compris
+AI_MOVE_INTERVAL_MS = 400
+
+class BackgammonGUI_AI(BackgammonGUI):
+    def __init__(self, env=None, ponder=True):
+        if env is None:
+            env = BackgammonEnv()
+        super().__init__(env)
+        # Le réseau TD(λ) remplace les heuristiques dès que des poids entraînés existent
+        network = TDNetwork.load() if Path(TD_WEIGHTS_FILE).exists() else None
+        self.ai = BackgammonAI(self.env, network=network, time_budget=AI_TIME_BUDGET)
+        # Les décisions de l'IA sont calculées dans un thread de fond (ai_worker.py)
+        self.worker = AIWorker(self.ai)
+        # Réflexion anticipée de l'IA pendant le tour du joueur humain
+        self.ponder = ponder
+        self._pending_after = None  # callback root.after en attente (délai ou scrutation)
+        self.root.title("Backgammon - Joueur vs IA")
+        self.begin_record()
+
+    def begin_record(self):
+        # Appelé une première fois par BackgammonGUI.__init__, avant la création de l'IA
+        ai = getattr(self, "ai", None)
+        self.recorder.begin_game(self.env.game_seed, ("humain", player_type(ai)), weights_hash(ai))
+
+    def _schedule(self, delay, callback):
+        self._pending_after = self.root.after(delay, callback)
+
+    def _cancel_ai(self):
+        """Abandonne le tour de l'IA en cours : calcul en fond et callbacks programmés"""
+        self.worker.cancel()
+        if self._pending_after is not None:
+            self.root.after_cancel(self._pending_after)
+            self._pending_after = None
+
+    def roll_dice(self):
+        """Lance les dés et démarre le tour de l'IA si c'est son tour"""
+        super().roll_dice()
+        if self.env.current_player == 1:
+            self._schedule(0, self.ai_turn)
+        elif self.ponder and self.valid_moves:
+            # Position finale du joueur encore inconnue : l'IA réfléchit depuis sa séquence probable
+            self.worker.ponder(self.env.position_key(), predict_dice=self.remaining_dice)
+
+    def end_turn(self):
+        super().end_turn()
+        if self.ponder and self.env.current_player == 1:
+            # Position finale connue : l'IA réfléchit à tous ses lancers en attendant le sien
+            self.worker.ponder(self.env.position_key())
+
+    def ai_turn(self):
+        self._pending_after = None
+        if not self.remaining_dice:
+            return
+        self.play_next_move()
+
+    def play_next_move(self):
+        """Demande le prochain coup au thread de l'IA ; la réponse est traitée par _poll_ai"""
+        self._pending_after = None
+        if not self.remaining_dice or not self.valid_moves:
+            self.pass_turn()
+            return
+        self.info_label.config(text="L'IA réfléchit...")
+        self.worker.submit(self.env.position_key(), self.valid_moves, self.remaining_dice)
+        self._schedule(POLL_INTERVAL_MS, self._poll_ai)
+
+    def _poll_ai(self):
+        result = self.worker.poll()
+        if result is None:
+            self._schedule(POLL_INTERVAL_MS, self._poll_ai)
+            return
+        self._pending_after = None
+        # La réflexion compte dans l'intervalle entre deux coups : même rythme sur toute machine
+        delay = max(0, int(AI_MOVE_INTERVAL_MS - result["seconds"] * 1000))
+        self.apply_ai_move(result["move"], result["stats"], delay, result["pondered"])
+
+    def apply_ai_move(self, move, stats=None, delay=AI_MOVE_INTERVAL_MS, pondered=False):
+        if not move:
+            self.pass_turn()
+            return
+
+        src, dest, die_used = move
+        subset = find_subset(self.remaining_dice, die_used)
+        if not subset:
+            self.pass_turn()
+            return
+
+        for d in subset:
+            self.remaining_dice.remove(d)
+
+        success, win = self.env.step_move(src, dest, die_used)
+        if success:
+            self.record_move(move)
+            text = f"L'IA a joué : {src} → {dest} (Dé utilisé : {die_used})"
+            if pondered:
+                text += " — réponse anticipée"
+            elif stats:
+                text += f" — profondeur {stats['depth']}, {stats['nodes']} nœuds"
+            self.info_label.config(text=text)
+            self.update_history()
+            self.update_valid_moves()
+            self.redraw()
+
+            if win:
+                # Récupérer le nombre de coups joués
+                moves_count = len(self.env.move_history) if hasattr(self.env, 'move_history') else 0
+                
+                # Enregistrer la victoire avec le nombre de coups
+                self.game_stats.add_win(2, moves_count)  # L'IA est joueur 2
+                self.recorder.end_game(1)
+                
+                self.ai.learn_from_game(won=True)  # L'IA a gagné
+                messagebox.showinfo("Victoire", f"L'IA a gagné en {moves_count} coups !")
+                self.worker.close(timeout=0)
+                self.recorder.close()
+                self.root.quit()
+                return
+
+        self._schedule(delay, self.play_next_move)
+
+    def on_canvas_click(self, event):
+        if self.env.current_player == 1:  # Ignore les clics pendant le tour de l'IA
+            return
+        super().on_canvas_click(event)
+
+    def reset_game(self):
+        self._cancel_ai()
+        super().reset_game()
+
+    def close(self):
+        """Ferme la fenêtre après avoir arrêté le thread de l'IA"""
+        self._cancel_ai()
+        self.worker.close(timeout=0)
+        super().close()
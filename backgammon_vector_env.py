@@ -0,0 +1,174 @@
+import numpy as np
+from backgammon_env import BackgammonEnv
+
+# Position de départ, identique à celle de BackgammonEnv.reset()
+INITIAL_BOARD = BackgammonEnv().board.copy()
+
+# Index de source réservé aux pions sur la barre dans les masques de coups
+BAR_INDEX = 24
+
+
+class VectorBackgammonEnv:
+    """
+    Fait tourner N parties en parallèle dans un seul tableau NumPy (N, 24, 2).
+
+    Les coups se jouent pion par pion comme dans BackgammonEnv.step_move, mais pour
+    toutes les parties à la fois. Les coups sont exprimés du point de vue du joueur
+    qui a le trait : la source s (0 à 23) désigne son point s + 1 compté depuis sa
+    sortie (24 = barre), et le pion arrive en s - dé (négatif = sortie du plateau).
+    Pour le Joueur 1 ce point est le point réel, pour le Joueur 2 c'est 25 - point.
+
+    Le tour passe automatiquement quand les dés sont épuisés ou qu'aucun coup n'est
+    possible, et les parties terminées sont réinitialisées aussitôt.
+    """
+
+    def __init__(self, num_envs, seed=None):
+        self.num_envs = num_envs
+        self.rng = np.random.default_rng(seed)
+        self.board = np.zeros((num_envs, 24, 2), dtype=np.int8)
+        self.bar = np.zeros((num_envs, 2), dtype=np.int8)
+        self.off = np.zeros((num_envs, 2), dtype=np.int8)
+        self.current_player = np.zeros(num_envs, dtype=np.int8)
+        self.dice = np.zeros((num_envs, 4), dtype=np.int8)  # 0 = dé déjà utilisé
+        self.moves_count = np.zeros(num_envs, dtype=np.int32)
+        self.games_finished = 0
+        self._rows = np.arange(num_envs)
+        self.reset()
+
+    def reset(self, indices=None):
+        """Réinitialise les parties désignées (toutes par défaut) et lance leurs dés."""
+        if indices is None:
+            indices = self._rows
+        self.board[indices] = INITIAL_BOARD
+        self.bar[indices] = 0
+        self.off[indices] = 0
+        self.current_player[indices] = 0
+        self.moves_count[indices] = 0
+        self.roll_dice(indices)
+        return self.board
+
+    def roll_dice(self, indices=None):
+        """Lance les dés des parties désignées ; un double donne quatre dés."""
+        if indices is None:
+            indices = self._rows
+        rolls = self.rng.integers(1, 7, size=(len(indices), 2), dtype=np.int8)
+        doubles = rolls[:, 0] == rolls[:, 1]
+        self.dice[indices, :2] = rolls
+        self.dice[indices, 2:] = np.where(doubles, rolls[:, 0], 0)[:, None]
+
+    def _perspective(self):
+        """Renvoie (own, opp) : pions du joueur au trait et de l'adversaire, vus par le joueur au trait."""
+        white = (self.current_player == 0)[:, None]
+        own = np.where(white, self.board[:, :, 0], self.board[:, ::-1, 1])
+        opp = np.where(white, self.board[:, :, 1], self.board[:, ::-1, 0])
+        return own, opp
+
+    def legal_moves(self):
+        """
+        Renvoie un masque booléen (N, 25, 6) des coups simples jouables :
+        masque[g, s, d - 1] est vrai si la partie g peut jouer la source s avec le dé d.
+        Les règles sont celles de BackgammonEnv (barre prioritaire, bearing off, 5 pions max par point).
+        """
+        n = self.num_envs
+        own, opp = self._perspective()
+        mask = np.zeros((n, 25, 6), dtype=bool)
+        blocked = (opp >= 2) | (own >= 5)
+        on_bar = self.bar[self._rows, self.current_player] > 0
+        can_bear_off = ~on_bar & (own[:, 6:].sum(axis=1) == 0)
+        occupied = own > 0
+        # Point occupé le plus éloigné de la sortie (-1 si aucun)
+        highest = np.where(occupied.any(axis=1), 23 - np.argmax(occupied[:, ::-1], axis=1), -1)
+
+        for die in range(1, 7):
+            d = die - 1
+            mask[:, BAR_INDEX, d] = on_bar & ~blocked[:, 24 - die]
+            mask[:, die:24, d] = occupied[:, die:] & ~blocked[:, :24 - die] & ~on_bar[:, None]
+            # Sortie exacte, ou avec un dé plus fort depuis le point le plus éloigné
+            mask[:, d, d] |= can_bear_off & occupied[:, d]
+            over = can_bear_off & (highest >= 0) & (highest < d)
+            mask[self._rows[over], highest[over], d] = True
+
+        available = np.zeros((n, 6), dtype=bool)
+        for slot in range(4):
+            has = self.dice[:, slot] > 0
+            available[self._rows[has], self.dice[has, slot] - 1] = True
+        return mask & available[:, None, :]
+
+    def sample_random_moves(self, mask=None):
+        """Tire au hasard un coup jouable par partie ; renvoie (src, die), avec src = -1 sans coup possible."""
+        if mask is None:
+            mask = self.legal_moves()
+        flat = mask.reshape(self.num_envs, -1)
+        scores = np.where(flat, self.rng.random(flat.shape), -1.0)
+        choice = np.argmax(scores, axis=1)
+        src = np.where(flat.any(axis=1), choice // 6, -1)
+        return src, choice % 6 + 1
+
+    def step(self, src, die):
+        """
+        Joue un coup par partie (src = -1 pour ne rien jouer), puis fait avancer les tours.
+        Les coups illégaux sont ignorés. Renvoie (dones, winners) où winners vaut 0 ou 1
+        pour les parties qui viennent de se terminer et -1 ailleurs ; ces parties sont
+        réinitialisées automatiquement.
+        """
+        src = np.asarray(src)
+        die = np.asarray(die)
+        mask = self.legal_moves()
+        play = src >= 0
+        play[play] = mask[self._rows[play], src[play], die[play] - 1]
+
+        g = self._rows[play]
+        s, d = src[play], die[play]
+        player = self.current_player[g]
+        opponent = 1 - player
+        # Retrait du pion de sa source
+        from_bar = s == BAR_INDEX
+        self.bar[g[from_bar], player[from_bar]] -= 1
+        on_board = ~from_bar
+        real_src = np.where(player == 0, s, 23 - s)
+        self.board[g[on_board], real_src[on_board], player[on_board]] -= 1
+        # Arrivée : sortie du plateau ou point (avec éventuelle frappe)
+        target = s - d
+        borne = target < 0
+        self.off[g[borne], player[borne]] += 1
+        lands = ~borne
+        gl, pl, ol = g[lands], player[lands], opponent[lands]
+        real_dest = np.where(pl == 0, target[lands], 23 - target[lands])
+        hit = self.board[gl, real_dest, ol] == 1
+        self.board[gl[hit], real_dest[hit], ol[hit]] = 0
+        self.bar[gl[hit], ol[hit]] += 1
+        self.board[gl, real_dest, pl] += 1
+        # Consommation du premier dé correspondant
+        slot = np.argmax(self.dice[g] == d[:, None], axis=1)
+        self.dice[g, slot] = 0
+        self.moves_count[g] += 1
+
+        winners = np.full(self.num_envs, -1, dtype=np.int8)
+        dones = np.zeros(self.num_envs, dtype=bool)
+        won = self.off[g, player] == 15
+        dones[g[won]] = True
+        winners[g[won]] = player[won]
+        if won.any():
+            self.games_finished += int(won.sum())
+            self.reset(g[won])
+
+        self._advance_turns()
+        return dones, winners
+
+    def _advance_turns(self, max_passes=8):
+        """Passe la main dans les parties sans dé restant ou sans coup jouable."""
+        for _ in range(max_passes):
+            stuck = ~self.legal_moves().any(axis=(1, 2))
+            if not stuck.any():
+                return
+            idx = self._rows[stuck]
+            self.current_player[idx] = 1 - self.current_player[idx]
+            self.roll_dice(idx)
+
+    def play_random(self, num_steps):
+        """Joue num_steps coups aléatoires dans toutes les parties ; renvoie le nombre de parties terminées."""
+        finished = self.games_finished
+        for _ in range(num_steps):
+            src, die = self.sample_random_moves()
+            self.step(src, die)
+        return self.games_finished - finished
@@ -0,0 +1,198 @@
+"""
+Base de données de bearing off « à un côté », précalculée puis mappée en mémoire.
+
+Pour chaque répartition d'au plus 15 pions sur les six points du jan intérieur,
+le fichier contient la distribution exacte du nombre de lancers nécessaires pour
+sortir tous les pions (en jouant à chaque lancer la séquence qui minimise
+l'espérance), ainsi que cette espérance.
+
+Génération (une seule fois) : python bearoff_db.py [--max-checkers 15]
+
+Format du fichier (little-endian) :
+- en-tête : b"BGBO", version (u16), nombre max de pions (u16),
+  nombre de positions (u32), nombre de cases de la distribution (u32)
+- espérances : float32[nombre de positions]
+- distributions : float32[nombre de positions, MAX_ROLLS] ; la dernière case
+  contient la probabilité d'avoir besoin de MAX_ROLLS lancers ou plus.
+
+Le fichier est ouvert avec np.memmap : la recherche d'une position est O(1)
+et plusieurs processus partagent les mêmes pages sans dupliquer la RAM.
+"""
+import argparse
+import struct
+import time
+from math import comb
+import numpy as np
+
+BEAROFF_DB_FILE = "bearoff.db"
+MAGIC = b"BGBO"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+MAX_ROLLS = 32
+MAX_CHECKERS = 15
+MAX_PER_POINT = 5  # limite de 5 pions par point, comme dans BackgammonEnv
+
+# Les 21 lancers distincts avec leur probabilité
+ROLLS = [((d1,) * 4 if d1 == d2 else (d2, d1), (1 if d1 == d2 else 2) / 36)
+         for d1 in range(1, 7) for d2 in range(d1, 7)]
+
+
+def num_positions(max_checkers=MAX_CHECKERS):
+    """Nombre de répartitions d'au plus max_checkers pions sur 6 points"""
+    return comb(max_checkers + 6, 6)
+
+
+def position_index(counts, max_checkers=MAX_CHECKERS):
+    """
+    Rang d'une position (c1, ..., c6), où ci est le nombre de pions à i points de la sortie.
+    Ordre lexicographique : le nombre de positions dont la première valeur est
+    inférieure à v se calcule en une formule (identité de la crosse de hockey).
+    """
+    rank = 0
+    budget = max_checkers
+    for i, count in enumerate(counts):
+        remaining_points = 5 - i
+        rank += comb(remaining_points + budget + 1, remaining_points + 1) - \
+            comb(remaining_points + budget + 1 - count, remaining_points + 1)
+        budget -= count
+    return rank
+
+
+def _all_positions(max_checkers):
+    """Toutes les positions, dans l'ordre de position_index"""
+    def rec(points, budget):
+        if points == 0:
+            yield ()
+            return
+        for count in range(budget + 1):
+            for rest in rec(points - 1, budget - count):
+                yield (count,) + rest
+    return list(rec(6, max_checkers))
+
+
+def _single_moves(position, die):
+    """Positions atteignables en jouant un pion avec un dé (règles du bearing off de BackgammonEnv)"""
+    results = []
+    highest = max((i for i in range(6) if position[i]), default=-1)
+    for i in range(6):
+        if not position[i]:
+            continue
+        target = i - die
+        if target >= 0:
+            if position[target] >= MAX_PER_POINT:
+                continue
+        elif not (target == -1 or i == highest):
+            # Un dé plus fort que nécessaire ne sort que le pion le plus éloigné
+            continue
+        new = list(position)
+        new[i] -= 1
+        if target >= 0:
+            new[target] += 1
+        results.append(tuple(new))
+    return results
+
+
+def _plays(position, dice):
+    """Positions finales distinctes pour un lancer, avec la règle d'utilisation maximale des dés"""
+    finals = {}  # position -> (nombre de dés joués, plus fort dé joué seul)
+
+    def explore(pos, remaining, used, first_die):
+        extended = False
+        for die in sorted(set(remaining), reverse=True):
+            rest = list(remaining)
+            rest.remove(die)
+            for succ in _single_moves(pos, die):
+                extended = True
+                explore(succ, tuple(rest), used + 1, first_die or die)
+        if not extended:
+            best = finals.get(pos)
+            if best is None or (used, first_die) > best:
+                finals[pos] = (used, first_die)
+
+    explore(position, tuple(dice), 0, 0)
+    max_used = max(used for used, _ in finals.values())
+    candidates = {pos: die for pos, (used, die) in finals.items() if used == max_used}
+    if max_used == 1 and len(dice) == 2 and dice[0] != dice[1]:
+        bigger = {pos for pos, die in candidates.items() if die == max(dice)}
+        if bigger:
+            return list(bigger)
+    return list(candidates)
+
+
+def generate(path=BEAROFF_DB_FILE, max_checkers=MAX_CHECKERS, verbose=True):
+    """Calcule toute la base par programmation dynamique et l'écrit dans `path`"""
+    start = time.perf_counter()
+    positions = _all_positions(max_checkers)
+    count = len(positions)
+    means = np.zeros(count, dtype=np.float64)
+    dists = np.zeros((count, MAX_ROLLS), dtype=np.float64)
+    probs = np.array([p for _, p in ROLLS])
+
+    # Chaque coup diminue le nombre de points restants : on traite les positions par pips croissants
+    order = sorted(range(count), key=lambda k: sum((i + 1) * c for i, c in enumerate(positions[k])))
+    for done, k in enumerate(order):
+        position = positions[k]
+        if not any(position):
+            dists[k, 0] = 1.0
+            continue
+        successors = []
+        for dice, _ in ROLLS:
+            # Sans coup jouable, la seule option est la position elle-même (lancer perdu)
+            options = [position_index(p, max_checkers) for p in _plays(position, dice)]
+            successors.append(min(options, key=lambda j: means[j]))
+        successors = np.array(successors)
+        stay = probs[successors == k].sum()
+        moving = successors != k
+        means[k] = (1 + probs[moving] @ means[successors[moving]]) / (1 - stay)
+        # P(n lancers) = sum_r p_r * P_succ(n - 1 lancers), avec la boucle sur soi-même pour les lancers perdus
+        shifted = probs[moving] @ dists[successors[moving]]
+        for n in range(1, MAX_ROLLS):
+            dists[k, n] = shifted[n - 1] + stay * dists[k, n - 1]
+        dists[k, MAX_ROLLS - 1] = max(0.0, 1.0 - dists[k, :MAX_ROLLS - 1].sum())
+        if verbose and done % 5000 == 0:
+            print(f"{done}/{count} positions ({time.perf_counter() - start:.0f} s)")
+
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, max_checkers, count, MAX_ROLLS))
+        f.write(means.astype("<f4").tobytes())
+        f.write(dists.astype("<f4").tobytes())
+    if verbose:
+        print(f"Base de bearing off écrite dans {path} : {count} positions en "
+              f"{time.perf_counter() - start:.0f} s.")
+
+
+class BearoffDatabase:
+    """Accès en lecture seule, mappé en mémoire, à un fichier produit par generate()"""
+
+    def __init__(self, path=BEAROFF_DB_FILE):
+        with open(path, "rb") as f:
+            magic, version, max_checkers, count, max_rolls = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} n'est pas une base de bearing off valide")
+        self.max_checkers = max_checkers
+        self.means = np.memmap(path, dtype="<f4", mode="r", offset=HEADER.size, shape=(count,))
+        self.distributions = np.memmap(path, dtype="<f4", mode="r", offset=HEADER.size + 4 * count,
+                                       shape=(count, max_rolls))
+
+    def expected_rolls(self, counts):
+        """Espérance du nombre de lancers pour sortir tous les pions de (c1, ..., c6)"""
+        return float(self.means[position_index(counts, self.max_checkers)])
+
+    def distribution(self, counts):
+        """Distribution du nombre de lancers restants (vue mappée, sans copie)"""
+        return self.distributions[position_index(counts, self.max_checkers)]
+
+
+def home_counts(board, player):
+    """Pions du joueur sur ses six points intérieurs, du plus proche au plus éloigné de la sortie"""
+    if player == 0:
+        return tuple(int(c) for c in board[:6, 0])
+    return tuple(int(c) for c in board[23:17:-1, 1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génère la base de bearing off")
+    parser.add_argument("--max-checkers", type=int, default=MAX_CHECKERS)
+    parser.add_argument("--output", default=BEAROFF_DB_FILE)
+    args = parser.parse_args()
+    generate(args.output, args.max_checkers)
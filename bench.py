@@ -0,0 +1,282 @@
+"""
+Banc d'essai des performances du moteur, de l'IA et de l'entraînement.
+
+Usage :
+    python bench.py                                   # mesures, JSON sur la sortie standard
+    python bench.py --save-baseline                   # enregistre les mesures comme référence
+    python bench.py --baseline bench_baseline.json --threshold 0.15 --metric-threshold games_per_sec=0.3
+
+Mesures (meilleur de --repeat essais) :
+- valid_moves_per_sec.<générateur> : coups produits par seconde par valid_moves,
+  pour chaque générateur de BackgammonEnv (voir MOVE_GENERATORS) ;
+- step_move_per_sec : coups appliqués par seconde en rejouant des parties fixes avec step_move ;
+- ai_move_per_sec : décisions par seconde de BackgammonAI.ai_move (heuristique, sans recherche) ;
+- games_per_sec : parties complètes d'entraînement par seconde, sans interface ni écriture ;
+- stats_write_ms.mean / .p95 : latence d'enregistrement d'une partie par GameStatistics.add_win.
+
+Tout est reproductible : les positions du corpus et les parties rejouées sont tirées
+d'une graine fixe (--seed) ; leur empreinte (corpus_hash) figure dans le résultat,
+et la comparaison à une référence issue d'un autre corpus est refusée. L'IA mesurée
+joue avec les poids par défaut (DEFAULT_WEIGHTS), jamais ceux de ai_weights.json.
+
+Comparaison à la référence : une mesure régresse si elle est moins bonne que la
+référence de plus du seuil relatif (--threshold, 10 % par défaut, ou le seuil propre
+à la mesure donné par --metric-threshold). Les mesures en *_ms sont meilleures
+quand elles baissent, les autres quand elles montent. Le code de sortie est 1 en
+cas de régression.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+from backgammon_env import BackgammonEnv, MOVE_GENERATORS
+from backgammon_ai import BackgammonAI, DEFAULT_WEIGHTS
+from evaluation_cache import EvaluationCache
+
+BASELINE_FILE = "bench_baseline.json"
+DEFAULT_THRESHOLD = 0.10
+
+# Les 21 lancers distincts, utilisés pour le corpus de positions
+ROLLS = [[d1] * 4 if d1 == d2 else [d2, d1] for d1 in range(1, 7) for d2 in range(d1, 7)]
+
+
+def _random_games(num_games, seed):
+    """Parties jouées au hasard parmi les séquences légales : liste de (lancers, séquences) par partie"""
+    rng = np.random.default_rng(seed)
+    env = BackgammonEnv(record_history=False, seed=seed)
+    games = []
+    for _ in range(num_games):
+        env.reset()
+        turns = []
+        while not env.check_win():
+            dice = env.roll_dice()
+            plays = env.legal_plays(dice)
+            play = plays[rng.integers(len(plays))] if plays else ()
+            turns.append((dice, play))
+            for move in play:
+                env.apply(move)
+            if env.check_win():
+                break
+            env.end_turn()
+        games.append(turns)
+    return games
+
+
+def build_corpus(num_positions=500, num_games=20, seed=0):
+    """
+    Corpus fixe : (positions, parties). Les positions sont des couples (clé de position, lancer)
+    pris à intervalles réguliers dans des parties aléatoires ; les parties servent à step_move.
+    """
+    games = _random_games(num_games, seed)
+    env = BackgammonEnv(record_history=False)
+    keys = []
+    for turns in games:
+        env.reset()
+        for dice, play in turns:
+            keys.append(env.position_key())
+            for move in play:
+                env.apply(move)
+            env.end_turn()
+    step = max(1, len(keys) // num_positions)
+    positions = [(key, ROLLS[i % len(ROLLS)]) for i, key in enumerate(keys[::step][:num_positions])]
+    return positions, games
+
+
+def corpus_hash(positions, games):
+    digest = hashlib.sha256()
+    for key, dice in positions:
+        digest.update(key + bytes(dice))
+    for turns in games:
+        for dice, play in turns:
+            digest.update(repr((dice, play)).encode())
+    return digest.hexdigest()[:16]
+
+
+def _best_of(repeat, measure):
+    """Meilleure valeur (la plus grande) de measure() sur `repeat` essais"""
+    return max(measure() for _ in range(repeat))
+
+
+def bench_valid_moves(positions, generator, repeat=3, calls_per_position=20):
+    env = BackgammonEnv(record_history=False, move_generator=generator)
+
+    def measure():
+        produced, elapsed = 0, 0.0
+        for key, dice in positions:
+            env.set_position_key(key)
+            start = time.perf_counter()
+            for _ in range(calls_per_position):
+                moves = env.valid_moves(dice)
+            elapsed += time.perf_counter() - start
+            produced += calls_per_position * len(moves)
+        return produced / elapsed
+    return _best_of(repeat, measure)
+
+
+def bench_step_move(games, repeat=3):
+    env = BackgammonEnv(record_history=True)
+
+    def measure():
+        applied = 0
+        start = time.perf_counter()
+        for turns in games:
+            env.reset()
+            for _, play in turns:
+                for move in play:
+                    env.step_move(*move)
+                applied += len(play)
+                env.end_turn()
+        return applied / (time.perf_counter() - start)
+    return _best_of(repeat, measure)
+
+
+def _bench_ai(env):
+    # Poids par défaut, cache privé et sans base de bearing off : les mesures ne dépendent
+    # ni d'un ai_weights.json du répertoire courant, ni de l'état du cache partagé, ni de
+    # la présence de bearoff.db
+    ai = BackgammonAI(env, cache=EvaluationCache())
+    ai.weights = dict(DEFAULT_WEIGHTS)
+    ai.bearoff_db = None
+    return ai
+
+
+def bench_ai_move(positions, repeat=3):
+    env = BackgammonEnv(record_history=False)
+    ai = _bench_ai(env)
+
+    def measure():
+        ai.cache.clear()
+        decisions, elapsed = 0, 0.0
+        for key, dice in positions:
+            env.set_position_key(key)
+            moves = env.valid_moves(dice)
+            if not moves:
+                continue
+            start = time.perf_counter()
+            ai.ai_move(moves, dice)
+            elapsed += time.perf_counter() - start
+            decisions += 1
+        return decisions / elapsed
+    return _best_of(repeat, measure)
+
+
+def bench_games(num_games=10, seed=0, repeat=3):
+    def measure():
+        env = BackgammonEnv(record_history=False, seed=seed)
+        ai = _bench_ai(env)
+        start = time.perf_counter()
+        for _ in range(num_games):
+            ai._play_training_game()
+        return num_games / (time.perf_counter() - start)
+    return _best_of(repeat, measure)
+
+
+def bench_stats_writes(num_writes=50, repeat=3):
+    # Import local : pandas n'est chargé que pour cette mesure
+    from game_statistics import GameStatistics
+
+    def measure():
+        latencies = []
+        with tempfile.TemporaryDirectory() as directory:
+            stats = GameStatistics(os.path.join(directory, "game_stats.csv"))
+            for i in range(num_writes):
+                start = time.perf_counter()
+                stats.add_win(1 + i % 2, 20 + i % 30)
+                latencies.append(time.perf_counter() - start)
+        return np.array(latencies) * 1000
+    # Latences : meilleur (le plus bas) de `repeat` essais, chacun sur un fichier neuf
+    trials = [measure() for _ in range(repeat)]
+    return {"mean": min(float(latencies.mean()) for latencies in trials),
+            "p95": min(float(np.percentile(latencies, 95)) for latencies in trials)}
+
+
+def run_benchmarks(seed=0, repeat=3, num_positions=500, num_games=10):
+    positions, games = build_corpus(num_positions, seed=seed)
+    metrics = {}
+    for generator in MOVE_GENERATORS:
+        metrics[f"valid_moves_per_sec.{generator}"] = bench_valid_moves(positions, generator, repeat)
+    metrics["step_move_per_sec"] = bench_step_move(games, repeat)
+    metrics["ai_move_per_sec"] = bench_ai_move(positions, repeat)
+    metrics["games_per_sec"] = bench_games(num_games, seed, repeat)
+    for name, value in bench_stats_writes(repeat=repeat).items():
+        metrics[f"stats_write_ms.{name}"] = value
+    return {
+        "seed": seed,
+        "corpus_hash": corpus_hash(positions, games),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "metrics": metrics,
+    }
+
+
+def compare(result, baseline, threshold=DEFAULT_THRESHOLD, metric_thresholds=None):
+    """
+    Compare les mesures à la référence ; renvoie un dictionnaire par mesure
+    (référence, valeur, variation relative, seuil, régression).
+    """
+    if baseline.get("corpus_hash") != result["corpus_hash"]:
+        raise ValueError("La référence a été mesurée sur un autre corpus (graine ou code différents)")
+    metric_thresholds = metric_thresholds or {}
+    report = {}
+    for name, value in result["metrics"].items():
+        reference = baseline["metrics"].get(name)
+        if reference is None:
+            continue
+        change = (value - reference) / reference if reference else 0.0
+        limit = metric_thresholds.get(name, threshold)
+        # Latences : une hausse est une dégradation ; débits : une baisse
+        worse = change if name.split(".")[0].endswith("_ms") else -change
+        report[name] = {
+            "baseline": reference,
+            "value": value,
+            "change": change,
+            "threshold": limit,
+            "regression": worse > limit,
+        }
+    return report
+
+
+def _parse_metric_threshold(text):
+    name, _, value = text.partition("=")
+    if not value:
+        raise argparse.ArgumentTypeError(f"format attendu : mesure=seuil (reçu {text!r})")
+    return name, float(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc d'essai du moteur, de l'IA et de l'entraînement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--positions", type=int, default=500)
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="enregistre le résultat comme nouvelle référence au lieu de comparer")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--metric-threshold", type=_parse_metric_threshold, action="append", default=[],
+                        help="seuil propre à une mesure, par exemple games_per_sec=0.3")
+    parser.add_argument("--output", help="écrit aussi le résultat JSON dans ce fichier")
+    args = parser.parse_args()
+
+    result = run_benchmarks(args.seed, args.repeat, args.positions, args.games)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(result, f, indent=4)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        result["comparison"] = compare(result, baseline, args.threshold, dict(args.metric_threshold))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=4)
+    print(json.dumps(result, indent=4))
+    if any(entry["regression"] for entry in result.get("comparison", {}).values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Mesure headless du coût de rendu du plateau (backgammon_gui.draw_board).
+
+Usage : python bench_render.py [--games 5] [--seed 0] [--budget-ops 30]
+
+Le plateau est dessiné sur un faux canvas (RecordingCanvas) qui n'affiche rien
+mais compte les opérations demandées à Tk : créations d'éléments, suppressions,
+itemconfigure, config. On rejoue des parties aléatoires fixes (graine --seed) en
+reproduisant les rendus de l'interface : sélection d'un point (surlignage des
+destinations), puis coup joué (surlignage effacé).
+
+Deux modes sont mesurés sur la même séquence de rendus :
+- incremental : le BoardRenderer ne met à jour que les points modifiés ;
+- full : le renderer est invalidé avant chaque rendu (équivalent de l'ancien
+  canvas.delete("all") suivi d'un dessin complet), pour comparaison.
+
+Le code de sortie est 1 si le nombre moyen d'opérations par rendu en mode
+incremental dépasse --budget-ops.
+"""
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+import numpy as np
+from backgammon_env import BackgammonEnv
+from backgammon_gui import BoardRenderer
+
+
+class RecordingCanvas:
+    """Faux canvas : conserve les éléments et leurs tags, compte les opérations"""
+
+    def __init__(self):
+        self.items = {}  # identifiant -> tags
+        self.ops = Counter()
+        self._next_id = 1
+
+    def _create(self, kind, *args, tags=(), **options):
+        self.ops["create"] += 1
+        if isinstance(tags, str):
+            tags = (tags,)
+        item = self._next_id
+        self._next_id += 1
+        self.items[item] = set(tags)
+        return item
+
+    def create_line(self, *args, **options):
+        return self._create("line", *args, **options)
+
+    def create_oval(self, *args, **options):
+        return self._create("oval", *args, **options)
+
+    def create_polygon(self, *args, **options):
+        return self._create("polygon", *args, **options)
+
+    def create_rectangle(self, *args, **options):
+        return self._create("rectangle", *args, **options)
+
+    def create_text(self, *args, **options):
+        return self._create("text", *args, **options)
+
+    def _matching(self, tag_or_id):
+        if tag_or_id == "all":
+            return list(self.items)
+        if isinstance(tag_or_id, int):
+            return [tag_or_id] if tag_or_id in self.items else []
+        return [item for item, tags in self.items.items() if tag_or_id in tags]
+
+    def delete(self, *tags_or_ids):
+        self.ops["delete"] += 1
+        for tag_or_id in tags_or_ids:
+            for item in self._matching(tag_or_id):
+                del self.items[item]
+                self.ops["deleted_items"] += 1
+
+    def itemconfigure(self, tag_or_id, **options):
+        self.ops["itemconfigure"] += 1
+        self.ops["configured_items"] += len(self._matching(tag_or_id))
+
+    itemconfig = itemconfigure
+
+    def coords(self, tag_or_id, *args):
+        self.ops["coords"] += 1
+
+    def config(self, **options):
+        self.ops["config"] += 1
+
+    configure = config
+
+    def total_ops(self):
+        """Appels adressés au canvas (hors compteurs d'éléments touchés)"""
+        return sum(count for name, count in self.ops.items() if name not in ("deleted_items", "configured_items"))
+
+
+def _render_sequence(num_games, seed):
+    """
+    Séquence d'états à rendre : (clé de position, point sélectionné, destinations),
+    comme l'interface en produit en jouant des parties aléatoires.
+    """
+    rng = np.random.default_rng(seed)
+    env = BackgammonEnv(record_history=False, seed=seed)
+    frames = []
+    for _ in range(num_games):
+        env.reset()
+        frames.append((env.position_key(), None, []))
+        while not env.check_win():
+            dice = env.roll_dice()
+            plays = env.legal_plays(dice)
+            play = plays[rng.integers(len(plays))] if plays else ()
+            for src, dest, die in play:
+                destinations = [m[1] for m in env.valid_moves(dice) if m[0] == src]
+                frames.append((env.position_key(), src, destinations))
+                env.apply((src, dest, die))
+                frames.append((env.position_key(), None, []))
+            if env.check_win():
+                break
+            env.end_turn()
+            frames.append((env.position_key(), None, []))
+    return frames
+
+
+def measure_rendering(frames, full=False):
+    """Rejoue les rendus de `frames` ; renvoie les opérations par rendu et le temps moyen"""
+    canvas = RecordingCanvas()
+    renderer = BoardRenderer(canvas)
+    env = BackgammonEnv(record_history=False)
+    per_frame = []
+    elapsed = 0.0
+    for key, selected, destinations in frames:
+        env.set_position_key(key)
+        if full:
+            renderer.invalidate()
+        before = canvas.total_ops()
+        start = time.perf_counter()
+        renderer.render(env, selected, destinations)
+        elapsed += time.perf_counter() - start
+        per_frame.append(canvas.total_ops() - before)
+    # Le premier rendu construit le décor : il est compté à part
+    first, rest = per_frame[0], np.array(per_frame[1:])
+    return {
+        "first_render_ops": first,
+        "ops_per_redraw_mean": float(rest.mean()),
+        "ops_per_redraw_p95": float(np.percentile(rest, 95)),
+        "ops_per_redraw_max": int(rest.max()),
+        "live_items": len(canvas.items),
+        "python_us_per_redraw": elapsed / len(frames) * 1e6,
+        "ops": dict(canvas.ops),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coût de rendu headless du plateau")
+    parser.add_argument("--games", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--budget-ops", type=float, default=30.0)
+    args = parser.parse_args()
+
+    frames = _render_sequence(args.games, args.seed)
+    result = {
+        "frames": len(frames),
+        "incremental": measure_rendering(frames),
+        "full": measure_rendering(frames, full=True),
+        "budget_ops": args.budget_ops,
+    }
+    print(json.dumps(result, indent=4))
+    if result["incremental"]["ops_per_redraw_mean"] > args.budget_ops:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
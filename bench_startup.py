@@ -0,0 +1,76 @@
+"""
+Mesure du temps d'import du moteur et de l'IA sans interface graphique.
+
+Usage : python bench_startup.py [--runs 5] [--budget-ms 50]
+
+Chaque mesure est faite dans un interpréteur neuf. On retient le meilleur des
+essais pour :
+- l'import de numpy seul (coût incompressible) ;
+- l'import de backgammon_env et backgammon_ai.
+
+Le surcoût propre au moteur (différence des deux) doit rester de l'ordre de
+quelques dizaines de millisecondes (--budget-ms, 50 ms par défaut). Le script
+vérifie aussi qu'aucun module graphique (tkinter, matplotlib) ni pandas n'est
+chargé. Le code de sortie est 1 si le budget est dépassé ou si un de ces modules
+est importé.
+"""
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# Modules qui ne doivent jamais être chargés par un import headless du moteur
+FORBIDDEN_MODULES = ["tkinter", "matplotlib", "pandas", "backgammon_gui", "game_statistics"]
+
+ENGINE_MODULES = ["backgammon_env", "backgammon_ai"]
+
+_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+
+def _measure(modules, runs):
+    """Meilleur temps d'import (en secondes) de `modules` sur `runs` interpréteurs neufs"""
+    code = _PROBE.format(imports="\n".join(f"import {m}" for m in modules), forbidden=FORBIDDEN_MODULES)
+    best, loaded = float("inf"), []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                             check=True, cwd=Path(__file__).resolve().parent)
+        result = json.loads(out.stdout)
+        best = min(best, result["seconds"])
+        loaded = result["loaded"]
+    return best, loaded
+
+
+def measure_startup(runs=5):
+    """Renvoie un dictionnaire avec les temps d'import (en millisecondes) et les modules interdits chargés"""
+    numpy_seconds, _ = _measure(["numpy"], runs)
+    engine_seconds, loaded = _measure(["numpy"] + ENGINE_MODULES, runs)
+    return {
+        "numpy_ms": numpy_seconds * 1000,
+        "engine_total_ms": engine_seconds * 1000,
+        "engine_overhead_ms": (engine_seconds - numpy_seconds) * 1000,
+        "forbidden_loaded": loaded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Temps d'import du moteur headless")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    result = measure_startup(args.runs)
+    result["budget_ms"] = args.budget_ms
+    print(json.dumps(result, indent=4))
+    if result["forbidden_loaded"] or result["engine_overhead_ms"] > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
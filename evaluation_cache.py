@@ -0,0 +1,100 @@
+import sys
+import threading
+from collections import OrderedDict
+
+# Surcoût approximatif d'une entrée dans l'OrderedDict (nœud de liste chaînée + table de hachage)
+ENTRY_OVERHEAD = 100
+
+
+def _sizeof(value):
+    """Taille approximative d'une valeur en mémoire (tableaux NumPy compris)"""
+    return sys.getsizeof(value) + getattr(value, "nbytes", 0)
+
+
+class EvaluationCache:
+    """
+    Cache d'évaluations indexé par clé de position (BackgammonEnv.position_key).
+
+    - La mémoire est bornée par max_bytes (estimation), avec éviction LRU.
+    - Les compteurs hits / misses / evictions mesurent son efficacité (voir stats()).
+    - Un verrou le rend sûr à partager entre l'IA de l'interface et la boucle d'entraînement.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # clé -> (valeur, taille)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        size = _sizeof(key) + _sizeof(value) + ENTRY_OVERHEAD
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (value, size)
+            self.current_bytes += size
+            self._evict()
+
+    def get_or_compute(self, key, compute):
+        """Renvoie la valeur en cache, ou la calcule avec compute() et la stocke"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+            self.evictions += 1
+
+    def resize(self, max_bytes):
+        """Change la limite mémoire, en évinçant immédiatement si nécessaire"""
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def reset_counters(self):
+        with self._lock:
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Instantané des compteurs, pour décider si augmenter la limite mémoire vaut le coup"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Cache partagé par défaut entre toutes les instances de BackgammonAI d'un même processus
+shared_cache = EvaluationCache()
@@ -0,0 +1,187 @@
+"""
+Format binaire compact d'enregistrement des parties.
+
+Un fichier contient une suite de parties, ajoutées au fur et à mesure
+(little-endian) :
+- en-tête du fichier : b"BGGR", version (u16)
+- pour chaque partie :
+  - en-tête (GAME_HEADER) : graine de la partie (i64, -1 si inconnue),
+    type de chaque joueur (2 x u8, indices de PLAYER_TYPES), empreinte des
+    poids de l'IA (16 octets, zéros sans IA), nombre d'enregistrements (u32),
+    vainqueur (i8 : 0, 1, ou NO_WINNER pour une partie interrompue)
+  - enregistrements de taille fixe (MOVE_DTYPE, 6 octets) : joueur, lancer
+    (2 dés, égaux pour un double), départ (BAR_CODE pour la barre), arrivée,
+    dé utilisé. Un dé utilisé nul marque un tour passé (aucun coup joué).
+
+GameRecordWriter garde en mémoire la partie en cours et l'écrit d'un seul
+os.write (O_APPEND) à sa fin : un arrêt brutal ne peut laisser qu'une dernière
+partie tronquée, que read_games ignore.
+
+read_games est un générateur : les parties sont lues une à une, leurs coups
+dans un tableau structuré NumPy, sans jamais charger le fichier entier.
+replay rejoue une partie dans un BackgammonEnv en vérifiant chaque coup.
+"""
+import hashlib
+import json
+import os
+import struct
+from collections import namedtuple
+import numpy as np
+from backgammon_env import BackgammonEnv, BAR_CODE, GAME_SEED_LIMIT, find_subset
+
+GAME_RECORDS_FILE = "game_records.bgr"
+MAGIC = b"BGGR"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sH")
+GAME_HEADER = struct.Struct("<qBB16sIb")
+MOVE_DTYPE = np.dtype([("player", "u1"), ("dice", "u1", 2), ("src", "i1"), ("dest", "i1"), ("die", "u1")])
+
+# Types de joueurs, codés par leur indice
+PLAYER_TYPES = ("humain", "heuristique", "recherche", "reseau")
+
+NO_WINNER = -1
+NO_WEIGHTS = bytes(16)
+
+GameRecord = namedtuple("GameRecord", ["seed", "players", "weights_hash", "winner", "moves"])
+
+
+def player_type(ai=None):
+    """Type de joueur (voir PLAYER_TYPES) d'une BackgammonAI, "humain" sans IA"""
+    if ai is None:
+        return "humain"
+    if ai.search_depth > 0 or ai.time_budget is not None:
+        return "recherche"
+    if ai.network is not None:
+        return "reseau"
+    return "heuristique"
+
+
+def weights_hash(ai=None):
+    """Empreinte (16 octets) des poids heuristiques et du réseau éventuel d'une BackgammonAI"""
+    if ai is None:
+        return NO_WEIGHTS
+    digest = hashlib.sha256(json.dumps(ai.weights, sort_keys=True).encode())
+    if ai.network is not None:
+        for array in (ai.network.w1, ai.network.b1, ai.network.w2, ai.network.b2):
+            digest.update(np.asarray(array, dtype="<f4").tobytes())
+    return digest.digest()[:16]
+
+
+def _seed_field(seed):
+    """
+    Valeur du champ graine (i64) : la graine de partie (BackgammonEnv.game_seed),
+    ou -1 si elle est inconnue ou non représentable (SeedSequence, entier hors de
+    [0, GAME_SEED_LIMIT)).
+    """
+    if isinstance(seed, (int, np.integer)) and not isinstance(seed, bool) and 0 <= seed < GAME_SEED_LIMIT:
+        return int(seed)
+    return -1
+
+
+class GameRecordWriter:
+    """
+    Écriture en flux des parties dans un fichier au format ci-dessus :
+    begin_game(), puis record() pour chaque coup ou tour passé, puis end_game(winner).
+    Utilisable comme gestionnaire de contexte ; close() écrit la partie en cours
+    comme interrompue.
+    """
+
+    def __init__(self, path=GAME_RECORDS_FILE):
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        if os.fstat(self._fd).st_size == 0:
+            os.write(self._fd, FILE_HEADER.pack(MAGIC, VERSION))
+        self._header = None
+        self._moves = []
+        self.games_written = 0
+
+    def begin_game(self, seed=None, players=("humain", "humain"), weights=NO_WEIGHTS):
+        """
+        Commence une partie ; une partie encore ouverte est d'abord écrite comme
+        interrompue, ou abandonnée si aucun coup n'y a été enregistré.
+        """
+        if self._header is not None and self._moves:
+            self.end_game(NO_WINNER)
+        self._header = (_seed_field(seed), PLAYER_TYPES.index(players[0]),
+                        PLAYER_TYPES.index(players[1]), weights)
+        self._moves = []
+
+    def record(self, player, dice, move=None):
+        """Enregistre un coup (départ, arrivée, dé) joué avec le lancer `dice`, ou un tour passé si move est None"""
+        d1, d2 = dice[0], dice[1] if len(dice) > 1 else dice[0]
+        if move is None:
+            self._moves.append((player, (d1, d2), 0, 0, 0))
+        else:
+            src, dest, die = move
+            self._moves.append((player, (d1, d2), BAR_CODE if src == "bar" else src, dest, die))
+
+    def end_game(self, winner):
+        """Écrit la partie en cours (vainqueur 0, 1 ou NO_WINNER) d'un seul appel système"""
+        if self._header is None:
+            return
+        seed, player1, player2, weights = self._header
+        moves = np.array(self._moves, dtype=MOVE_DTYPE)
+        os.write(self._fd, GAME_HEADER.pack(seed, player1, player2, weights, len(moves), winner)
+                 + moves.tobytes())
+        self._header = None
+        self._moves = []
+        self.games_written += 1
+
+    def close(self):
+        if self._fd is None:
+            return
+        if self._header is not None and self._moves:
+            self.end_game(NO_WINNER)
+        os.close(self._fd)
+        self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_games(path=GAME_RECORDS_FILE):
+    """Générateur des parties (GameRecord) d'un fichier ; une dernière partie tronquée est ignorée"""
+    with open(path, "rb") as f:
+        header = f.read(FILE_HEADER.size)
+        if len(header) < FILE_HEADER.size:
+            return
+        magic, version = FILE_HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} n'est pas un fichier de parties valide")
+        while True:
+            header = f.read(GAME_HEADER.size)
+            if len(header) < GAME_HEADER.size:
+                return
+            seed, player1, player2, weights, count, winner = GAME_HEADER.unpack(header)
+            data = f.read(count * MOVE_DTYPE.itemsize)
+            if len(data) < count * MOVE_DTYPE.itemsize:
+                return
+            yield GameRecord(None if seed == -1 else seed, (PLAYER_TYPES[player1], PLAYER_TYPES[player2]),
+                             weights, winner, np.frombuffer(data, dtype=MOVE_DTYPE))
+
+
+def replay(game, env=None):
+    """
+    Rejoue une partie depuis la position initiale et renvoie l'environnement final
+    (initialisé avec la graine de la partie si elle est connue).
+    Chaque coup passe par step_move ; ValueError si un coup est refusé, si le dé
+    utilisé ne correspond pas au lancer, ou si le vainqueur ne correspond pas.
+    """
+    env = env if env is not None else BackgammonEnv(record_history=False)
+    env.reset(seed=game.seed)
+    for i, (player, dice, src, dest, die) in enumerate(game.moves.tolist()):
+        env.current_player = player
+        if die == 0:
+            continue
+        roll = [dice[0]] * 4 if dice[0] == dice[1] else list(dice)
+        if find_subset(roll, die) is None:
+            raise ValueError(f"Coup {i} : dé {die} incompatible avec le lancer {dice}")
+        success, _ = env.step_move("bar" if src == BAR_CODE else src, dest, die)
+        if not success:
+            raise ValueError(f"Coup {i} refusé : {src} -> {dest} (dé {die})")
+    if game.winner != NO_WINNER and not (env.current_player == game.winner and env.check_win()):
+        raise ValueError(f"La partie rejouée ne se termine pas par la victoire du joueur {game.winner + 1}")
+    return env
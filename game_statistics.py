@@ -1,92 +1,840 @@
+import atexit
+import glob
+import io
+import json
 import os
+import time
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import tkinter as tk
-from tkinter import ttk
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+# Colonnes du fichier de résultats
+STATS_COLUMNS = ['date', 'winner', 'moves_count']
+
+# Stockages disponibles : "csv" (texte lisible) ou "columnar" (segments NumPy mappés en mémoire)
+STATS_BACKENDS = ("csv", "columnar")
+DEFAULT_STATS_BACKEND = "csv"
+
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Colonnes d'un segment du stockage "columnar" : secondes epoch, équipe gagnante (1 ou 2), nombre de coups
+SEGMENT_COLUMNS = {"date": np.int64, "winner": np.int8, "moves": np.int32}
+
+# Périodes des cumuls (Rollups) maintenus à chaque ajout
+ROLLUP_GRANULARITIES = ("hour", "day", "week")
+
+# Libellés des équipes indexés par leur code
+WINNER_LABELS = np.array(['', 'team1', 'team2'], dtype=object)
+
+
+def shard_path(stats_file, shard):
+    """Fichier propre à un processus écrivain : game_stats.csv -> game_stats.<shard>.csv"""
+    root, ext = os.path.splitext(stats_file)
+    return f"{root}.{shard}{ext}"
+
+
+def _complete_lines(data):
+    """Garde les lignes complètes : une dernière ligne interrompue (arrêt brutal) est ignorée"""
+    end = data.rfind(b"\n")
+    return data[:end + 1] if end >= 0 else b""
+
+
+def _read_complete_csv(path):
+    """Lit les lignes complètes d'un fichier CSV ; None s'il n'y a aucune ligne lisible"""
+    with open(path, "rb") as f:
+        data = _complete_lines(f.read())
+    if not data:
+        return None
+    try:
+        return pd.read_csv(io.BytesIO(data))
+    except (pd.errors.EmptyDataError, pd.errors.ParserError):
+        print(f"Fichier de statistiques illisible ignoré : {path}")
+        return None
+
+
+def _empty_aggregates():
+    """Agrégats des nombres de coups des parties gagnées, par équipe"""
+    return {f"team{team}": {"count": 0, "sum": 0, "sum_sq": 0, "min": None, "max": None} for team in (1, 2)}
+
+
+def _add_result(aggregates, team, moves_count):
+    stats = aggregates[f"team{team}"]
+    stats["count"] += 1
+    stats["sum"] += moves_count
+    stats["sum_sq"] += moves_count * moves_count
+    stats["min"] = moves_count if stats["min"] is None else min(stats["min"], moves_count)
+    stats["max"] = moves_count if stats["max"] is None else max(stats["max"], moves_count)
+
+
+def _merge_aggregates(total, other):
+    """Ajoute `other` à `total` (modifié sur place) et renvoie `total`"""
+    for team, stats in other.items():
+        if not stats["count"]:
+            continue
+        merged = total[team]
+        merged["count"] += stats["count"]
+        merged["sum"] += stats["sum"]
+        merged["sum_sq"] += stats["sum_sq"]
+        merged["min"] = stats["min"] if merged["min"] is None else min(merged["min"], stats["min"])
+        merged["max"] = stats["max"] if merged["max"] is None else max(merged["max"], stats["max"])
+    return total
+
+
+def _aggregate_columns(winners, moves):
+    """Agrégats calculés d'un bloc sur des colonnes (codes d'équipe, nombres de coups)"""
+    aggregates = _empty_aggregates()
+    winners = np.asarray(winners)
+    moves = np.asarray(moves, dtype=np.int64)
+    for team in (1, 2):
+        values = moves[winners == team]
+        if len(values):
+            aggregates[f"team{team}"] = {"count": len(values), "sum": int(values.sum()),
+                                         "sum_sq": int((values * values).sum()),
+                                         "min": int(values.min()), "max": int(values.max())}
+    return aggregates
+
+
+def bucket_start(epoch, granularity):
+    """Début (heure locale, en secondes epoch) de l'heure, du jour ou de la semaine (lundi) contenant epoch"""
+    t = time.localtime(epoch)
+    if granularity == "hour":
+        return int(time.mktime((t.tm_year, t.tm_mon, t.tm_mday, t.tm_hour, 0, 0, 0, 0, -1)))
+    day = t.tm_mday - (t.tm_wday if granularity == "week" else 0)
+    return int(time.mktime((t.tm_year, t.tm_mon, day, 0, 0, 0, 0, 0, -1)))
+
+
+class Rollups:
+    """
+    Cumuls par période (ROLLUP_GRANULARITIES) : pour chaque début de période,
+    [victoires équipe 1, victoires équipe 2, coups cumulés équipe 1, coups cumulés équipe 2].
+    Les moyennes de coups s'en déduisent ; les cumuls de plusieurs fichiers s'additionnent.
+    """
+
+    def __init__(self, buckets=None):
+        self.buckets = buckets or {granularity: {} for granularity in ROLLUP_GRANULARITIES}
+
+    def add(self, epoch, team, moves_count):
+        for granularity, table in self.buckets.items():
+            bucket = table.setdefault(bucket_start(epoch, granularity), [0, 0, 0, 0])
+            bucket[team - 1] += 1
+            bucket[team + 1] += moves_count
+
+    def add_columns(self, epochs, winners, moves):
+        """Ajoute un bloc de résultats (une conversion de date par quart d'heure distinct)"""
+        epochs = np.asarray(epochs, dtype=np.int64)
+        if not len(epochs):
+            return
+        winners = np.asarray(winners)
+        moves = np.asarray(moves, dtype=np.int64)
+        values = np.stack([winners == 1, winners == 2,
+                           np.where(winners == 1, moves, 0), np.where(winners == 2, moves, 0)], axis=1)
+        # Tous les fuseaux horaires sont décalés d'un multiple de 15 minutes
+        quarters, inverse = np.unique(epochs - epochs % 900, return_inverse=True)
+        for granularity, table in self.buckets.items():
+            starts = np.array([bucket_start(q, granularity) for q in quarters.tolist()], dtype=np.int64)
+            unique, groups = np.unique(starts[inverse], return_inverse=True)
+            sums = np.zeros((len(unique), 4), dtype=np.int64)
+            np.add.at(sums, groups, values.astype(np.int64))
+            for start, row in zip(unique.tolist(), sums.tolist()):
+                bucket = table.setdefault(start, [0, 0, 0, 0])
+                for i in range(4):
+                    bucket[i] += row[i]
+
+    def merge(self, other):
+        for granularity, table in other.buckets.items():
+            merged = self.buckets[granularity]
+            for start, row in table.items():
+                bucket = merged.setdefault(start, [0, 0, 0, 0])
+                for i in range(4):
+                    bucket[i] += row[i]
+        return self
+
+    def to_json(self):
+        return {granularity: {str(start): row for start, row in table.items()}
+                for granularity, table in self.buckets.items()}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls({granularity: {int(start): row for start, row in data.get(granularity, {}).items()}
+                    for granularity in ROLLUP_GRANULARITIES})
+
+    def query(self, granularity="day", start=None, end=None):
+        """
+        Périodes de `granularity` qui recoupent [start, end] (secondes epoch, None = sans borne) :
+        (débuts de période triés, tableau (n, 4) des cumuls).
+        """
+        table = self.buckets[granularity]
+        starts = np.array(sorted(table), dtype=np.int64)
+        keep = np.ones(len(starts), dtype=bool)
+        if start is not None:
+            keep &= starts >= bucket_start(start, granularity)
+        if end is not None:
+            keep &= starts <= end
+        starts = starts[keep]
+        values = np.array([table[s] for s in starts.tolist()], dtype=np.int64).reshape(-1, 4)
+        return starts, values
+
+
+def _parse_csv_results(data):
+    """(dates epoch, codes d'équipe, nombres de coups) de lignes date,teamN,coups sans en-tête"""
+    df = pd.read_csv(io.BytesIO(data), header=None, names=STATS_COLUMNS)
+    moves = pd.to_numeric(df['moves_count'], errors='coerce').fillna(0).to_numpy(dtype=np.int64)
+    return _parse_dates(df['date']), np.where(df['winner'] == 'team1', 1, 2), moves
+
+
+def _parse_journal_results(data):
+    """(dates epoch, codes d'équipe, nombres de coups) de lignes d'un journal columnar sans en-tête"""
+    df = pd.read_csv(io.BytesIO(data), header=None, names=list(SEGMENT_COLUMNS))
+    return df['date'].to_numpy(), df['winner'].to_numpy(), df['moves'].to_numpy()
+
+
+class FileAggregates:
+    """
+    Agrégats et cumuls par période (Rollups) d'un fichier de résultats en ajout seul,
+    conservés dans <fichier>.agg.json avec la taille du fichier qu'ils couvrent. Si le fichier a grandi depuis (arrêt brutal entre
+    l'écriture des données et celle des agrégats, fichier d'un autre processus), seule la
+    fin est relue ; s'il a rétréci ou si le fichier d'agrégats manque, tout est recalculé.
+
+    Les agrégats persistés ne comptent que des lignes relues sur disque : les résultats
+    ajoutés par add() restent « en attente » jusqu'à leur écriture, puis flushed() relit
+    la fin du fichier. Chaque sauvegarde décrit donc exactement les `bytes` premiers
+    octets, même si plusieurs processus ajoutent au même fichier et s'écrasent le
+    fichier d'agrégats : le suivant à l'ouvrir relit ce qui manque.
+    """
+
+    def __init__(self, path, parse):
+        self.path = path
+        self.sidecar = path + ".agg.json"
+        self.parse = parse
+        self.aggregates = _empty_aggregates()
+        self.rollups = Rollups()
+        self.bytes = 0
+        # Résultats ajoutés par ce processus et pas encore écrits dans le fichier
+        self.pending = _empty_aggregates()
+        self.pending_rollups = Rollups()
+        try:
+            with open(self.sidecar) as f:
+                saved = json.load(f)
+            self.aggregates, self.rollups = saved["aggregates"], Rollups.from_json(saved["rollups"])
+            self.bytes = saved["bytes"]
+        except (OSError, ValueError, KeyError):
+            self.aggregates, self.rollups = _empty_aggregates(), Rollups()
+        self.refresh()
+
+    def refresh(self):
+        """
+        Met les agrégats à jour avec ce qui a été ajouté au fichier depuis la dernière
+        lecture, et les sauvegarde si quelque chose a été relu : le processus suivant
+        n'aura qu'à charger le fichier d'agrégats.
+        """
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        if size < self.bytes:
+            self.aggregates, self.rollups, self.bytes = _empty_aggregates(), Rollups(), 0
+        if size == self.bytes:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self.bytes)
+            data = _complete_lines(f.read())
+        consumed = len(data)
+        if self.bytes == 0:
+            data = data[data.find(b"\n") + 1:]  # en-tête
+        if data:
+            epochs, winners, moves = self.parse(data)
+            _merge_aggregates(self.aggregates, _aggregate_columns(winners, moves))
+            self.rollups.add_columns(epochs, winners, moves)
+        if consumed:
+            self.bytes += consumed
+            self.save()
+
+    def add(self, epoch, team, moves_count):
+        """Compte un résultat en attente d'écriture (à appeler avant de le confier à l'écrivain)"""
+        _add_result(self.pending, team, moves_count)
+        self.pending_rollups.add(epoch, team, moves_count)
+
+    def flushed(self):
+        """Après une écriture : les résultats en attente sont relus du fichier (et sauvegardés)"""
+        self.pending, self.pending_rollups = _empty_aggregates(), Rollups()
+        self.refresh()
+
+    def totals(self):
+        """(agrégats, cumuls par période) du fichier, résultats en attente compris"""
+        if not (self.pending["team1"]["count"] or self.pending["team2"]["count"]):
+            return self.aggregates, self.rollups
+        aggregates = _empty_aggregates()
+        _merge_aggregates(aggregates, self.aggregates)
+        _merge_aggregates(aggregates, self.pending)
+        return aggregates, Rollups().merge(self.rollups).merge(self.pending_rollups)
+
+    def save(self):
+        """Sauvegarde les agrégats des `bytes` premiers octets du fichier (ceux qui ont été relus)"""
+        temporary = f"{self.sidecar}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            json.dump({"bytes": self.bytes, "aggregates": self.aggregates, "rollups": self.rollups.to_json()}, f)
+        os.replace(temporary, self.sidecar)
+
+
+def _format_dates(epochs):
+    """Dates locales au format DATE_FORMAT (une conversion par valeur distincte)"""
+    unique, inverse = np.unique(np.asarray(epochs, dtype=np.int64), return_inverse=True)
+    text = np.array([time.strftime(DATE_FORMAT, time.localtime(e)) for e in unique.tolist()], dtype=object)
+    return text[inverse]
+
+
+def _parse_dates(dates):
+    """Secondes epoch de dates locales au format DATE_FORMAT (une conversion par valeur distincte)"""
+    unique, inverse = np.unique(np.asarray(dates, dtype=str), return_inverse=True)
+    epochs = np.array([int(time.mktime(time.strptime(d, DATE_FORMAT))) for d in unique], dtype=np.int64)
+    return epochs[inverse]
+
+
+class ResultWriter:
+    """
+    Écriture en ajout seul de résultats dans un fichier CSV.
+
+    - Les lignes sont mises en tampon et écrites d'un seul os.write (O_APPEND) toutes les
+      flush_every lignes, ou au premier ajout après flush_interval secondes, puis fsync.
+    - À l'ouverture, une dernière ligne incomplète laissée par un arrêt brutal est tronquée,
+      pour que les ajouts suivants repartent sur une ligne propre.
+    - Un fichier devrait n'avoir qu'un écrivain : plusieurs processus écrivent chacun dans
+      leur shard (voir GameStatistics), et la lecture fusionne les shards. Des écrivains
+      partageant un fichier n'y perdent pas de lignes (un os.write O_APPEND par écriture,
+      agrégats relus du fichier), mais la réparation à l'ouverture suppose qu'aucun autre
+      n'est en train d'écrire.
+    """
+
+    def __init__(self, path, header, flush_every=100, flush_interval=1.0, on_flush=None):
+        self.path = path
+        self.header = header
+        # Appelé après chaque écriture effective sur disque (mise à jour des agrégats persistés)
+        self.on_flush = on_flush
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._lines = []
+        self._fd = None
+        self._last_flush = time.monotonic()
+
+    def _open(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        size = os.fstat(fd).st_size
+        if size:
+            # Récupère la fin du fichier : seules les lignes complètes sont conservées
+            tail = os.pread(fd, min(size, 4096), max(0, size - 4096))
+            if not tail.endswith(b"\n"):
+                size = max(0, size - 4096) + len(_complete_lines(tail))
+                os.ftruncate(fd, size)
+        if size == 0:
+            os.write(fd, (self.header + "\n").encode())
+        self._fd = fd
+
+    def _still_at_path(self):
+        try:
+            return os.path.samestat(os.fstat(self._fd), os.stat(self.path))
+        except FileNotFoundError:
+            return False
+
+    def append(self, line):
+        self._lines.append(line)
+        if len(self._lines) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Écrit les lignes en attente et force leur écriture sur disque"""
+        self._last_flush = time.monotonic()
+        if not self._lines:
+            return
+        if self._fd is not None and not self._still_at_path():
+            # Fichier renommé depuis l'ouverture (journal converti en segment par une autre instance)
+            os.close(self._fd)
+            self._fd = None
+        if self._fd is None:
+            self._open()
+        os.write(self._fd, "".join(self._lines).encode())
+        os.fsync(self._fd)
+        self._lines = []
+        if self.on_flush is not None:
+            self.on_flush()
+
+    def close(self):
+        self.flush()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class CsvStore:
+    """Stockage texte : une ligne date,winner,moves_count par partie dans game_stats.csv ou un de ses shards"""
+
+    def __init__(self, stats_file, shard=None, flush_every=1, flush_interval=1.0):
+        self.stats_file = stats_file
+        self.write_file = stats_file if shard is None else shard_path(stats_file, shard)
+        self._writer = ResultWriter(self.write_file, ",".join(STATS_COLUMNS), flush_every, flush_interval,
+                                    on_flush=self._save_aggregates)
+        self._aggregates = {}  # fichier -> FileAggregates, créés à la demande
+
+    def _file_aggregates(self, path):
+        if path not in self._aggregates:
+            self._aggregates[path] = FileAggregates(path, _parse_csv_results)
+        return self._aggregates[path]
+
+    def _save_aggregates(self):
+        self._file_aggregates(self.write_file).flushed()
+
+    def append(self, epoch, team, moves_count):
+        # Compté en attente avant l'écriture : l'écrivain peut écrire aussitôt et relire le fichier
+        self._file_aggregates(self.write_file).add(epoch, team, moves_count)
+        self._writer.append(f"{time.strftime(DATE_FORMAT, time.localtime(epoch))},team{team},{moves_count}\n")
+
+    def summaries(self):
+        """(agrégats, cumuls par période) de chaque fichier : une lecture de fin de fichier au plus"""
+        for path in set(self.files()) | {self.write_file}:
+            # Relit ce que d'autres processus ont pu ajouter (un stat si rien n'a changé)
+            file_aggregates = self._file_aggregates(path)
+            file_aggregates.refresh()
+            yield file_aggregates.totals()
+
+    def flush(self):
+        self._writer.flush()
+
+    def close(self):
+        self._writer.close()
+
+    def files(self):
+        """Fichier principal et shards existants"""
+        root, ext = os.path.splitext(self.stats_file)
+        shards = sorted(glob.glob(glob.escape(root) + ".*" + ext))
+        return [path for path in [self.stats_file] + shards if os.path.exists(path)]
+
+    def to_dataframe(self):
+        frames = [df for df in map(_read_complete_csv, self.files()) if df is not None]
+        if not frames:
+            # Créer un DataFrame vide avec les colonnes nécessaires
+            return pd.DataFrame(columns=STATS_COLUMNS)
+        if len(frames) == 1:
+            return frames[0]
+        # Fusion des shards dans l'ordre chronologique
+        return pd.concat(frames, ignore_index=True).sort_values('date', kind='stable', ignore_index=True)
+
+    def latest(self, count):
+        """Les `count` dernières parties, en ne lisant que la fin de chaque fichier"""
+        frames = []
+        for path in self.files():
+            with open(path, "rb") as f:
+                size = f.seek(0, os.SEEK_END)
+                offset = max(0, size - 4096 - 64 * count)
+                f.seek(offset)
+                data = _complete_lines(f.read())
+            data = data[data.find(b"\n") + 1:]  # en-tête, ou première ligne coupée par la lecture
+            if data:
+                frames.append(pd.read_csv(io.BytesIO(data), header=None, names=STATS_COLUMNS).tail(count))
+        if not frames:
+            return pd.DataFrame(columns=STATS_COLUMNS)
+        df = pd.concat(frames, ignore_index=True).sort_values('date', kind='stable', ignore_index=True)
+        return df.tail(count)
+
+
+class ColumnarStore:
+    """
+    Stockage en colonnes dans un répertoire (game_stats_columns/ à côté de game_stats.csv).
+
+    - Segments : un fichier .npy par colonne (SEGMENT_COLUMNS), lus avec mmap_mode="r" :
+      rien n'est chargé en mémoire avant d'être parcouru.
+    - Journal : les nouvelles parties sont ajoutées dans journal.<écrivain>.csv (entiers seulement)
+      par un ResultWriter ; tous les segment_rows résultats, le journal est renommé en
+      .compacting, converti en segment, inscrit dans manifest.<écrivain>.json puis supprimé.
+      Un arrêt brutal pendant ces étapes est réparé à l'ouverture suivante (_recover).
+    - Chaque processus écrit sous son propre nom d'écrivain ; la lecture fusionne tout.
+    - Migration : à l'ouverture par l'écrivain "main", les fichiers CSV existants (legacy_csv)
+      sont convertis en segments puis renommés en .migrated.
+    """
+
+    def __init__(self, directory, writer="main", segment_rows=100000, flush_every=1, flush_interval=1.0,
+                 legacy_csv=()):
+        self.directory = directory
+        self.writer = writer
+        self.segment_rows = segment_rows
+        os.makedirs(directory, exist_ok=True)
+        self.journal_file = os.path.join(directory, f"journal.{writer}.csv")
+        self._manifest, self._manifest_version = None, None
+        self._own_manifest()
+        self._recover()
+        for path in legacy_csv:
+            self._migrate(path)
+        self._writer = ResultWriter(self.journal_file, ",".join(SEGMENT_COLUMNS), flush_every, flush_interval,
+                                    on_flush=self._save_aggregates)
+        self._aggregates = {}  # journal -> FileAggregates, créés à la demande
+        self._segment_rollups = {}  # nom de segment -> Rollups (les segments ne changent plus)
+        self._manifest_cache = {}  # manifeste d'un autre écrivain -> ((mtime_ns, taille), contenu)
+        self._journal_rows = 0
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file, "rb") as f:
+                self._journal_rows = max(0, _complete_lines(f.read()).count(b"\n") - 1)
+
+    def _manifest_path(self, writer):
+        return os.path.join(self.directory, f"manifest.{writer}.json")
+
+    @staticmethod
+    def _read_manifest(path):
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+        return {"segments": []}
+
+    @staticmethod
+    def _file_version(path):
+        """(mtime_ns, taille) d'un fichier, None s'il n'existe pas"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _own_manifest(self):
+        """
+        Manifeste de notre écrivain, relu s'il a changé sur disque : d'autres
+        instances du même processus (menu, interface) écrivent sous le même nom.
+        """
+        path = self._manifest_path(self.writer)
+        version = self._file_version(path)
+        if self._manifest is None or version != self._manifest_version:
+            self._manifest, self._manifest_version = self._read_manifest(path), version
+        return self._manifest
+
+    def _sources(self):
+        return {segment["source"] for segment in self._own_manifest()["segments"]}
+
+    def _next_segment_index(self):
+        """Premier numéro de segment libre, d'après le manifeste et les fichiers présents"""
+        prefix = f"{self.writer}-"
+        names = [segment["name"] for segment in self._own_manifest()["segments"]]
+        names += [os.path.basename(path).split(".")[0]
+                  for path in glob.glob(os.path.join(glob.escape(self.directory), glob.escape(prefix) + "*.npy"))]
+        indices = [int(name[len(prefix):]) for name in names
+                   if name.startswith(prefix) and name[len(prefix):].isdigit()]
+        return max(indices, default=-1) + 1
+
+    def _replace_atomically(self, path, write):
+        """Écrit un fichier sous un nom temporaire, le force sur disque puis le met en place"""
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+
+    def _write_segment(self, columns, source):
+        name = f"{self.writer}-{self._next_segment_index():06d}"
+        rollups = Rollups()
+        rollups.add_columns(columns["date"], columns["winner"], columns["moves"])
+        for column, dtype in SEGMENT_COLUMNS.items():
+            values = np.ascontiguousarray(columns[column], dtype=dtype)
+            self._replace_atomically(os.path.join(self.directory, f"{name}.{column}.npy"),
+                                     lambda f: np.save(f, values))
+        self._manifest["segments"].append({
+            "name": name,
+            "rows": len(columns["date"]),
+            "source": source,
+            "aggregates": _aggregate_columns(columns["winner"], columns["moves"]),
+            "rollups": rollups.to_json(),
+        })
+        manifest = json.dumps(self._manifest, indent=1).encode()
+        self._replace_atomically(self._manifest_path(self.writer), lambda f: f.write(manifest))
+        self._manifest_version = self._file_version(self._manifest_path(self.writer))
+
+    @staticmethod
+    def _read_journal(path):
+        df = _read_complete_csv(path)
+        if df is None:
+            return None
+        return {column: df[column].to_numpy(dtype=dtype) for column, dtype in SEGMENT_COLUMNS.items()}
+
+    def _compact_file(self, path):
+        columns = self._read_journal(path)
+        if columns is not None and len(columns["date"]):
+            self._write_segment(columns, os.path.basename(path))
+        os.remove(path)
+
+    def _recover(self):
+        """Termine une conversion journal -> segment interrompue par un arrêt brutal"""
+        sources = self._sources()
+        for path in sorted(glob.glob(glob.escape(self.journal_file) + ".*.compacting")):
+            if os.path.basename(path) in sources:
+                os.remove(path)  # segment déjà inscrit : seul le fichier source restait
+            else:
+                self._compact_file(path)
+
+    def _compact(self):
+        self._writer.close()
+        # Les agrégats du journal passent dans le manifeste avec le segment
+        self._aggregates.pop(self.journal_file, None)
+        if os.path.exists(self.journal_file + ".agg.json"):
+            os.remove(self.journal_file + ".agg.json")
+        compacting = f"{self.journal_file}.{self._next_segment_index()}.compacting"
+        os.replace(self.journal_file, compacting)
+        self._compact_file(compacting)
+        self._journal_rows = 0
+
+    def _migrate(self, path):
+        """Convertit un ancien fichier CSV (date texte, winner teamN) en segment"""
+        source = "csv:" + os.path.basename(path)
+        if not os.path.exists(path):
+            return
+        if source not in self._sources():
+            df = _read_complete_csv(path)
+            if df is not None and len(df):
+                self._write_segment({
+                    "date": _parse_dates(df['date']),
+                    "winner": np.where(df['winner'] == 'team1', 1, 2),
+                    "moves": pd.to_numeric(df['moves_count'], errors='coerce').fillna(0).to_numpy(),
+                }, source)
+        os.replace(path, path + ".migrated")
+        if os.path.exists(path + ".agg.json"):
+            os.remove(path + ".agg.json")
+
+    def _file_aggregates(self, path):
+        if path not in self._aggregates:
+            self._aggregates[path] = FileAggregates(path, _parse_journal_results)
+        return self._aggregates[path]
+
+    def _save_aggregates(self):
+        self._file_aggregates(self.journal_file).flushed()
+
+    def append(self, epoch, team, moves_count):
+        # Compté en attente avant l'écriture : l'écrivain peut écrire aussitôt et relire le journal
+        self._file_aggregates(self.journal_file).add(epoch, team, moves_count)
+        self._writer.append(f"{epoch},{team},{moves_count}\n")
+        self._journal_rows += 1
+        if self._journal_rows >= self.segment_rows:
+            self._compact()
+
+    def flush(self):
+        self._writer.flush()
+
+    def close(self):
+        self._writer.close()
+
+    def _manifests(self):
+        """
+        Manifestes de tous les écrivains, chacun relu seulement si sa date de modification
+        ou sa taille a changé depuis la dernière lecture
+        """
+        own = self._manifest_path(self.writer)
+        paths = set(glob.glob(os.path.join(glob.escape(self.directory), "manifest.*.json"))) | {own}
+        for path in list(self._manifest_cache):
+            if path not in paths:
+                del self._manifest_cache[path]
+        for path in sorted(paths):
+            if path == own:
+                yield self._own_manifest()
+                continue
+            version = self._file_version(path)
+            cached = self._manifest_cache.get(path)
+            if cached is None or cached[0] != version:
+                cached = self._manifest_cache[path] = (version, self._read_manifest(path))
+            yield cached[1]
+
+    def _pending_journals(self, listed):
+        """Journaux en cours, et conversions d'autres processus pas encore inscrites"""
+        for path in sorted(glob.glob(os.path.join(glob.escape(self.directory), "journal.*"))):
+            if path.endswith((".csv", ".compacting")) and os.path.basename(path) not in listed:
+                yield path
+
+    def summaries(self):
+        """(agrégats, cumuls par période) de chaque segment (lus dans les manifestes) et de chaque journal"""
+        listed = set()
+        for manifest in self._manifests():
+            for segment in manifest["segments"]:
+                listed.add(segment["source"])
+                if segment["name"] not in self._segment_rollups:
+                    self._segment_rollups[segment["name"]] = Rollups.from_json(segment["rollups"])
+                yield segment["aggregates"], self._segment_rollups[segment["name"]]
+        # Le journal de ce processus est compté même s'il n'existe pas encore (parties en tampon)
+        for path in set(self._pending_journals(listed)) | {self.journal_file}:
+            file_aggregates = self._file_aggregates(path)
+            file_aggregates.refresh()
+            yield file_aggregates.totals()
+
+    def chunks(self):
+        """
+        Parcourt les données par morceaux : dictionnaires {colonne: tableau}.
+        Les segments sont des vues mappées en mémoire ; les journaux sont lus en entier.
+        """
+        listed = set()
+        for manifest in self._manifests():
+            for segment in manifest["segments"]:
+                listed.add(segment["source"])
+                yield {column: np.load(os.path.join(self.directory, f"{segment['name']}.{column}.npy"),
+                                       mmap_mode="r")
+                       for column in SEGMENT_COLUMNS}
+        for path in self._pending_journals(listed):
+            columns = self._read_journal(path)
+            if columns is not None:
+                yield columns
+
+    def columns(self):
+        """Toutes les données, concaténées dans l'ordre chronologique"""
+        chunks = list(self.chunks())
+        if not chunks:
+            return {column: np.empty(0, dtype=dtype) for column, dtype in SEGMENT_COLUMNS.items()}
+        columns = {column: np.concatenate([chunk[column] for chunk in chunks]) for column in SEGMENT_COLUMNS}
+        if len(chunks) > 1:
+            order = np.argsort(columns["date"], kind="stable")
+            columns = {column: values[order] for column, values in columns.items()}
+        return columns
+
+    def latest(self, count):
+        """Les `count` dernières parties : seules les fins de segments sont lues"""
+        chunks = [{column: np.asarray(values[-count:]) for column, values in chunk.items()}
+                  for chunk in self.chunks()]
+        if not chunks:
+            return _columns_to_dataframe({column: np.empty(0, dtype=dtype)
+                                          for column, dtype in SEGMENT_COLUMNS.items()})
+        columns = {column: np.concatenate([chunk[column] for chunk in chunks]) for column in SEGMENT_COLUMNS}
+        order = np.argsort(columns["date"], kind="stable")[-count:]
+        return _columns_to_dataframe({column: values[order] for column, values in columns.items()})
+
+    def to_dataframe(self):
+        return _columns_to_dataframe(self.columns())
+
+
+def _columns_to_dataframe(columns):
+    """DataFrame au format du CSV (date texte, winner teamN) à partir de colonnes de segment"""
+    return pd.DataFrame({
+        'date': _format_dates(columns["date"]),
+        'winner': WINNER_LABELS[columns["winner"]],
+        'moves_count': columns["moves"],
+    }, columns=STATS_COLUMNS)
+
 
 class GameStatistics:
-    def __init__(self):
-        self.stats_file = "game_stats.csv"
-        self.df = self._load_stats()
-        
-    def _load_stats(self):
-        if os.path.exists(self.stats_file):
-            try:
-                return pd.read_csv(self.stats_file)
-            except:
-                # Créer un DataFrame vide avec les colonnes nécessaires
-                return pd.DataFrame(columns=['date', 'winner', 'moves_count'])
+    """
+    Résultats des parties (date, équipe gagnante, nombre de coups).
+
+    add_win ajoute un seul enregistrement au stockage (backend "csv" ou "columnar"),
+    sans relire ni réécrire l'historique. Par défaut chaque résultat est écrit aussitôt
+    (interface) ; en entraînement, un flush_every élevé regroupe les écritures.
+    Le DataFrame df n'est construit qu'au premier accès : créer un GameStatistics ne lit rien.
+    Avec shard, les résultats de ce processus vont dans leur propre fichier : plusieurs
+    processus peuvent enregistrer en même temps, et la lecture fusionne tout.
+    """
+
+    def __init__(self, stats_file="game_stats.csv", shard=None, backend=DEFAULT_STATS_BACKEND,
+                 flush_every=1, flush_interval=1.0):
+        self.stats_file = stats_file
+        if backend == "csv":
+            self.store = CsvStore(stats_file, shard, flush_every, flush_interval)
+        elif backend == "columnar":
+            # Le premier ouvrant principal reprend l'historique CSV existant (fichier et shards)
+            legacy = CsvStore(stats_file).files() if shard is None else []
+            self.store = ColumnarStore(os.path.splitext(stats_file)[0] + "_columns", shard or "main",
+                                       flush_every=flush_every, flush_interval=flush_interval,
+                                       legacy_csv=legacy)
         else:
-            # Créer un DataFrame vide avec les colonnes nécessaires
-            return pd.DataFrame(columns=['date', 'winner', 'moves_count'])
-    
+            raise ValueError(f"Stockage de statistiques inconnu : {backend}")
+        # Les résultats en attente sont écrits même si le programme se termine sans save_stats()
+        atexit.register(self.store.close)
+        self._df = None
+        self._new_rows = []  # ajoutés depuis la lecture de df
+
+    @property
+    def df(self):
+        if self._df is None:
+            self._df = self._load_stats()
+            self._new_rows = []
+        elif self._new_rows:
+            new = pd.DataFrame(self._new_rows, columns=STATS_COLUMNS)
+            self._df = new if len(self._df) == 0 else pd.concat([self._df, new], ignore_index=True)
+            self._new_rows = []
+        return self._df
+
+    def _load_stats(self):
+        self.save_stats()
+        return self.store.to_dataframe()
+
     def save_stats(self):
-        self.df.to_csv(self.stats_file, index=False)
+        """Écrit sur disque les résultats encore en tampon"""
+        self.store.flush()
+
+    def close(self):
+        """Écrit les résultats en tampon, ferme le fichier et retire l'appel de fin de programme"""
+        self.store.close()
+        atexit.unregister(self.store.close)
     
     def add_win(self, team, moves_count):
-        # Afficher les données reçues
-        print(f"Enregistrement de la victoire: Équipe {team}, Coups: {moves_count}")
-        
         # Vérifier que moves_count est bien un nombre
-        if not isinstance(moves_count, (int, float)):
+        if not isinstance(moves_count, (int, float, np.integer, np.floating)):
             print(f"ATTENTION: moves_count n'est pas un nombre: {moves_count}, type: {type(moves_count)}")
             try:
                 moves_count = int(moves_count)
                 print(f"Converti en: {moves_count}")
-            except:
+            except (TypeError, ValueError):
                 print("Impossible de convertir en nombre, utilisation de 0 par défaut")
                 moves_count = 0
-        # Ajouter une nouvelle ligne au DataFrame
-        new_row = pd.DataFrame({
-            'date': [pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')],
-            'winner': [f"team{team}"],
-            'moves_count': [int(moves_count)]
-        })
-        self.df = pd.concat([self.df, new_row], ignore_index=True)
-        self.save_stats()
+        epoch = int(time.time())
+        self.store.append(epoch, team, int(moves_count))
+        if self._df is not None:
+            self._new_rows.append((time.strftime(DATE_FORMAT, time.localtime(epoch)), f"team{team}",
+                                   int(moves_count)))
     
     def get_win_percentages(self):
-        if len(self.df) == 0:
-            return {"team1": 0, "team2": 0, "team1_wins": 0, "team2_wins": 0, "total_games": 0, 
-                    "avg_moves_team1": 0, "avg_moves_team2": 0}
-        
-        # Calculer les statistiques de victoires
-        win_counts = self.df['winner'].value_counts()
-        total_games = len(self.df)
-        
-        # Obtenir les compteurs pour chaque équipe (avec 0 par défaut si pas de victoires)
-        team1_wins = win_counts.get('team1', 0)
-        team2_wins = win_counts.get('team2', 0)
-        
-        # Calculer les pourcentages
-        team1_pct = (team1_wins / total_games) * 100 if total_games > 0 else 0
-        team2_pct = (team2_wins / total_games) * 100 if total_games > 0 else 0
-        
-        # Pour le calcul des coups moyens, assurez-vous que moves_count est un nombre
-        team1_moves = self.df[self.df['winner'] == 'team1']['moves_count'].astype(float)
-        team2_moves = self.df[self.df['winner'] == 'team2']['moves_count'].astype(float)
-        
-        # Afficher des traces pour debugger
-        print(f"Team1 moves data: {team1_moves.tolist()}")
-        print(f"Team2 moves data: {team2_moves.tolist()}")
-        
-        avg_moves_team1 = team1_moves.mean() if len(team1_moves) > 0 else 0
-        avg_moves_team2 = team2_moves.mean() if len(team2_moves) > 0 else 0
-        
-        print(f"Avg moves team1: {avg_moves_team1}")
-        print(f"Avg moves team2: {avg_moves_team2}")
-        
-        return {
-            "team1": team1_pct, 
-            "team2": team2_pct,
-            "team1_wins": team1_wins,
-            "team2_wins": team2_wins,
-            "total_games": total_games,
-            "avg_moves_team1": avg_moves_team1,
-            "avg_moves_team2": avg_moves_team2
-        }
+        """
+        Pourcentages de victoires et statistiques des nombres de coups par équipe,
+        calculés en O(1) à partir des agrégats tenus à jour par le stockage.
+        """
+        aggregates = _empty_aggregates()
+        for file_aggregates, _ in self.store.summaries():
+            _merge_aggregates(aggregates, file_aggregates)
+        total_games = aggregates["team1"]["count"] + aggregates["team2"]["count"]
+        result = {"total_games": total_games}
+        for team, stats in aggregates.items():
+            count = stats["count"]
+            mean = stats["sum"] / count if count else 0
+            # Variance à partir de la somme des carrés (bornée à 0 contre les erreurs d'arrondi)
+            variance = max(0.0, stats["sum_sq"] / count - mean * mean) if count else 0
+            result[team] = count / total_games * 100 if total_games else 0
+            result[f"{team}_wins"] = count
+            result[f"avg_moves_{team}"] = mean
+            result[f"std_moves_{team}"] = variance ** 0.5
+            result[f"min_moves_{team}"] = stats["min"] or 0
+            result[f"max_moves_{team}"] = stats["max"] or 0
+        return result
+
+    def rollups(self):
+        """Cumuls par heure, jour et semaine de tout l'historique"""
+        total = Rollups()
+        for _, rollups in self.store.summaries():
+            total.merge(rollups)
+        return total
+
+    def query_history(self, granularity="day", start=None, end=None):
+        """
+        Victoires et coups moyens par période sur [start, end] (secondes epoch, datetime
+        ou texte de date ; None = sans borne), sans relire l'historique.
+        Renvoie un DataFrame : start, team1_wins, team2_wins, avg_moves_team1, avg_moves_team2.
+        """
+        if granularity not in ROLLUP_GRANULARITIES:
+            raise ValueError(f"Granularité inconnue : {granularity}")
+        starts, values = self.rollups().query(granularity, _to_epoch(start), _to_epoch(end))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            averages = np.nan_to_num(values[:, 2:] / values[:, :2])
+        return pd.DataFrame({
+            'start': pd.to_datetime(_format_dates(starts), format=DATE_FORMAT),
+            'team1_wins': values[:, 0],
+            'team2_wins': values[:, 1],
+            'avg_moves_team1': averages[:, 0],
+            'avg_moves_team2': averages[:, 1],
+        })
+
+    def latest(self, count=10):
+        """Les `count` dernières parties, de la plus récente à la plus ancienne (DataFrame)"""
+        self.save_stats()
+        return self.store.latest(count).iloc[::-1].reset_index(drop=True)
+
+
+def _to_epoch(value):
+    """Secondes epoch d'une borne de requête (nombre, datetime, Timestamp ou texte ; heure locale)"""
+    if value is None or isinstance(value, (int, float, np.integer)):
+        return value
+    return int(pd.Timestamp(value).to_pydatetime().timestamp())
+
 
 class GameUI:
     def __init__(self, stats):
@@ -94,6 +842,8 @@ class GameUI:
 
     # Mettre à jour la méthode create_global_stats pour ajouter l'information sur les coups moyens
     def create_global_stats(self, parent):
+        import tkinter as tk
+        from tkinter import ttk
         stats_data = self.stats.get_win_percentages()
         
         # Frame pour les statistiques textuelles
@@ -108,7 +858,10 @@ class GameUI:
     
     # Mettre à jour la méthode create_history_stats pour ajouter la colonne nombre de coups dans le tableau
     def create_history_stats(self, parent):
-        df = self.stats.df
+        import tkinter as tk
+        from tkinter import ttk
+        # Seules les dernières parties sont lues, pas tout l'historique
+        df = self.stats.latest(10)
         
         # Tableau des 10 dernières parties - ajout de la colonne de coups
         if len(df) > 0:
@@ -123,9 +876,8 @@ class GameUI:
             tree.column('Gagnant', width=120)
             tree.column('Coups', width=120)
             
-            # Afficher les 10 dernières parties (ou moins s'il y en a moins)
-            display_rows = min(10, len(df))
-            for idx in range(display_rows-1, -1, -1):
+            # Afficher les 10 dernières parties (ou moins s'il y en a moins), la plus récente en premier
+            for idx in range(len(df)):
                 row = df.iloc[idx]
                 winner_text = "Équipe 1" if row['winner'] == 'team1' else "Équipe 2" 
                 tree.insert('', 'end', values=(row['date'], winner_text, row['moves_count']))
@@ -137,6 +889,10 @@ class GameUI:
         self.create_moves_graph(moves_frame)
     
     def create_moves_graph(self, parent):
+        # matplotlib et son backend Tk ne sont chargés qu'à l'affichage d'un graphique
+        import tkinter as tk
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
         stats_data = self.stats.get_win_percentages()
         fig, ax = plt.subplots(figsize=(8, 4))
         
@@ -2,7 +2,7 @@ import tkinter as tk
 from tkinter import ttk
 from backgammon_env import BackgammonEnv
 from backgammon_gui import BackgammonGUI
-from backgammon_ai import BackgammonGUI_AI
+from backgammon_gui_ai import BackgammonGUI_AI
 from game_statistics import GameStatistics
 from stats_window import StatsWindow
 
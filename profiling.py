@@ -0,0 +1,146 @@
+"""
+Instrumentation optionnelle des fonctions critiques du moteur et de l'IA.
+
+Activation :
+- variable d'environnement BACKGAMMON_PROFILE=1 (avant l'import du moteur), ou
+- profiling.enable() / profiling.disable() à tout moment.
+
+Désactivée, l'instrumentation ne coûte rien : les méthodes d'origine restent en place
+dans les classes. Activée, chaque méthode enregistrée (instrument()) est remplacée par
+une enveloppe qui compte les appels et mesure leur durée (temps inclusif : un appel à
+ai_move compte aussi le temps passé dans valid_moves).
+
+snapshot() renvoie à tout moment, y compris pendant un entraînement, un dictionnaire
+par fonction : nombre d'appels, temps cumulé, moyenne, maximum et percentiles
+(calculés sur les SAMPLE_SIZE derniers appels). snapshot_json() en donne la version JSON.
+
+Limite : les processus de train_self_play_parallel ont leurs propres compteurs.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+ENV_VARIABLE = "BACKGAMMON_PROFILE"
+
+# Nombre de durées conservées par fonction pour le calcul des percentiles
+SAMPLE_SIZE = 4096
+
+PERCENTILES = (50, 90, 99)
+
+_enabled = False
+_registry = []  # (classe, nom d'attribut, nom affiché, méthode d'origine)
+_stats = {}
+_lock = threading.Lock()
+
+
+class FunctionStats:
+    """Compteurs d'une fonction instrumentée"""
+
+    def __init__(self):
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+        self.clear()
+
+    def clear(self):
+        with _lock:
+            self.calls = 0
+            self.total = 0.0
+            self.max = 0.0
+            self.samples.clear()
+
+    def record(self, seconds):
+        with _lock:
+            self.calls += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+            self.samples.append(seconds)
+
+    def summary(self):
+        """Résumé en secondes pour le cumul, en microsecondes pour les durées d'appel"""
+        with _lock:
+            samples = sorted(self.samples)
+            calls, total, longest = self.calls, self.total, self.max
+        result = {
+            "calls": calls,
+            "total_s": total,
+            "mean_us": total / calls * 1e6 if calls else 0.0,
+            "max_us": longest * 1e6,
+        }
+        for p in PERCENTILES:
+            rank = min(len(samples) - 1, int(p / 100 * len(samples)))
+            result[f"p{p}_us"] = samples[rank] * 1e6 if samples else 0.0
+        return result
+
+
+def _timed(name, func):
+    stats = _stats.setdefault(name, FunctionStats())
+    perf_counter = time.perf_counter
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats.record(perf_counter() - start)
+    return wrapper
+
+
+def instrument(cls, methods):
+    """
+    Enregistre des méthodes de `cls` à instrumenter. methods : {attribut: nom affiché}.
+    Plusieurs attributs peuvent partager un même nom affiché (leurs compteurs sont cumulés).
+    """
+    for attribute, name in methods.items():
+        original = cls.__dict__[attribute]
+        _registry.append((cls, attribute, name, original))
+        _stats.setdefault(name, FunctionStats())
+        if _enabled:
+            setattr(cls, attribute, _timed(name, original))
+
+
+def enable():
+    """Active l'instrumentation de toutes les méthodes enregistrées"""
+    global _enabled
+    if not _enabled:
+        _enabled = True
+        for cls, attribute, name, original in _registry:
+            setattr(cls, attribute, _timed(name, original))
+
+
+def disable():
+    """Remet les méthodes d'origine en place ; les compteurs sont conservés"""
+    global _enabled
+    if _enabled:
+        _enabled = False
+        for cls, attribute, _, original in _registry:
+            setattr(cls, attribute, original)
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Remet tous les compteurs à zéro"""
+    for stats in _stats.values():
+        stats.clear()
+
+
+def snapshot():
+    """Instantané des compteurs de chaque fonction (dictionnaire)"""
+    return {
+        "enabled": _enabled,
+        "functions": {name: stats.summary() for name, stats in _stats.items()},
+    }
+
+
+def snapshot_json(indent=4):
+    return json.dumps(snapshot(), indent=indent)
+
+
+if os.environ.get(ENV_VARIABLE, "").lower() not in ("", "0", "false", "no"):
+    _enabled = True
@@ -14,7 +14,13 @@ class StatsWindow:
         self.window.resizable(True, True)
         
         self.stats = GameStatistics()
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
         self.create_widgets()
+
+    def close(self):
+        # Libère le stockage : sinon atexit le garde en vie jusqu'à la fin du programme
+        self.stats.close()
+        self.window.destroy()
         
     def create_widgets(self):
         # Frame principale
@@ -42,7 +48,7 @@ class StatsWindow:
         self.create_history_stats(self.history_tab)
         
         # Bouton fermer
-        ttk.Button(main_frame, text="Fermer", command=self.window.destroy).pack(pady=10)
+        ttk.Button(main_frame, text="Fermer", command=self.close).pack(pady=10)
     
     def create_global_stats(self, parent):
         stats_data = self.stats.get_win_percentages()
@@ -82,7 +88,6 @@ class StatsWindow:
         
         # Graphique en barres pour le nombre moyen de coups
         avg_moves = [stats_data['avg_moves_team1'], stats_data['avg_moves_team2']]
-        print(f"Valeurs pour le graphique: {avg_moves}")  # Debug
 
         # Si les deux valeurs sont 0, afficher un message
         if avg_moves[0] == 0 and avg_moves[1] == 0:
@@ -113,8 +118,18 @@ class StatsWindow:
         canvas.draw()
         canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
     
+    def _history_granularity(self):
+        """Période des cumuls selon l'étendue de l'historique : heure, jour ou semaine"""
+        days = self.stats.query_history('day')
+        span = days['start'].iloc[-1] - days['start'].iloc[0]
+        if span <= pd.Timedelta(days=3):
+            return 'hour'
+        if span <= pd.Timedelta(days=730):
+            return 'day'
+        return 'week'
+
     def create_history_stats(self, parent):
-        if len(self.stats.df) == 0:
+        if self.stats.get_win_percentages()['total_games'] == 0:
             ttk.Label(parent, text="Aucune partie enregistrée", font=("Arial", 14)).pack(pady=50)
             return
         
@@ -122,19 +137,28 @@ class StatsWindow:
         history_frame = ttk.Frame(parent)
         history_frame.pack(fill=tk.BOTH, expand=True, pady=10)
         
-        # Préparer les données pour le graphique d'évolution
-        df = self.stats.df.copy()
-        df['date'] = pd.to_datetime(df['date'])
-        df['cumul_team1'] = (df['winner'] == 'team1').cumsum()
-        df['cumul_team2'] = (df['winner'] == 'team2').cumsum()
-        
         # Création du graphique d'évolution
         fig, ax = plt.subplots(figsize=(11, 5))
         fig.subplots_adjust(bottom=0.2)  # Donne plus d'espace pour les dates en bas
         fig.patch.set_facecolor('#f0f0f0')
         
-        ax.plot(df['date'], df['cumul_team1'], color='#3498db', marker='o', label='Équipe 1')
-        ax.plot(df['date'], df['cumul_team2'], color='#e74c3c', marker='s', label='Équipe 2')
+        # Victoires cumulées à partir des cumuls par période (jamais partie par partie)
+        history = self.stats.query_history(self._history_granularity())
+        dates = history['start'].to_numpy()
+        cumul_team1 = history['team1_wins'].cumsum().to_numpy()
+        cumul_team2 = history['team2_wins'].cumsum().to_numpy()
+        
+        # Au plus un point par pixel de largeur : les cumuls sont exacts aux points conservés
+        width_px = int(fig.get_figwidth() * fig.dpi)
+        if len(dates) > width_px:
+            keep = np.unique(np.linspace(0, len(dates) - 1, width_px).round().astype(int))
+            dates, cumul_team1, cumul_team2 = dates[keep], cumul_team1[keep], cumul_team2[keep]
+        markers = len(dates) <= 50
+        
+        ax.plot(dates, cumul_team1, color='#3498db', marker='o' if markers else None,
+                drawstyle='steps-post', label='Équipe 1')
+        ax.plot(dates, cumul_team2, color='#e74c3c', marker='s' if markers else None,
+                drawstyle='steps-post', label='Équipe 2')
         
         ax.set_title('Évolution des victoires au fil du temps', fontsize=14, fontweight='bold')
         ax.set_xlabel('Date')
@@ -161,10 +185,10 @@ class StatsWindow:
         tree.column('Gagnant', width=150)
         tree.column('Coups', width=150)
         
-        # Afficher les 10 dernières parties (ou moins s'il y en a moins)
-        display_rows = min(10, len(df))
-        for idx in range(display_rows-1, -1, -1):
-            row = df.iloc[idx]
+        # Afficher les 10 dernières parties (ou moins s'il y en a moins), la plus récente en premier
+        latest = self.stats.latest(10)
+        for idx in range(len(latest)):
+            row = latest.iloc[idx]
             winner_text = "Équipe 1" if row['winner'] == 'team1' else "Équipe 2" 
             tree.insert('', 'end', values=(row['date'], winner_text, row['moves_count']))
         
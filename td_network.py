@@ -0,0 +1,168 @@
+"""
+Évaluateur neuronal façon TD-Gammon, entièrement en NumPy.
+
+- Entrée : encodage standard à 198 valeurs (4 unités par point et par joueur,
+  pions sur la barre, pions sortis, joueur au trait).
+- Sortie : probabilité que le Joueur 1 gagne la partie.
+- Apprentissage : TD(λ) en jouant contre soi-même.
+- Poids sauvegardés en binaire compact (.npz).
+
+Toutes les positions candidates d'un tour sont évaluées en un seul produit
+matriciel (voir TDNetwork.best_play).
+"""
+import time
+import numpy as np
+from backgammon_env import BackgammonEnv
+
+NUM_INPUTS = 198
+
+# Fichier de poids par défaut du réseau
+TD_WEIGHTS_FILE = "td_weights.npz"
+
+
+def encode_positions(boards, bars, sides):
+    """
+    Encode un lot de positions en une matrice (n, 198).
+    boards : (n, 24, 2) pions par point et par joueur ; bars : (n, 2) ; sides : (n,) joueur au trait.
+    """
+    boards = np.asarray(boards, dtype=np.float32)
+    bars = np.asarray(bars, dtype=np.float32)
+    sides = np.asarray(sides)
+    n = len(boards)
+    units = np.empty((n, 24, 2, 4), dtype=np.float32)
+    units[..., 0] = boards >= 1
+    units[..., 1] = boards >= 2
+    units[..., 2] = boards >= 3
+    units[..., 3] = np.maximum(boards - 3, 0) / 2
+    off = 15 - boards.sum(axis=1) - bars
+    return np.concatenate([
+        units.reshape(n, 192),
+        bars / 2,
+        off / 15,
+        np.stack([sides == 0, sides == 1], axis=1).astype(np.float32),
+    ], axis=1)
+
+
+def encode_env(env):
+    """Encode la position courante d'un environnement (matrice (1, 198))"""
+    return encode_positions(env.board[None], [env.bar], [env.current_player])
+
+
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+class TDNetwork:
+    def __init__(self, hidden=40, seed=None):
+        rng = np.random.default_rng(seed)
+        self.w1 = rng.normal(0, 0.1, (NUM_INPUTS, hidden)).astype(np.float32)
+        self.b1 = np.zeros(hidden, dtype=np.float32)
+        self.w2 = rng.normal(0, 0.1, hidden).astype(np.float32)
+        self.b2 = np.float32(0.0)
+        self.games_trained = 0
+
+    def forward(self, x):
+        """Probabilité de victoire du Joueur 1 pour chaque ligne de x (n, 198) -> (n,)"""
+        hidden = _sigmoid(x @ self.w1 + self.b1)
+        return _sigmoid(hidden @ self.w2 + self.b2)
+
+    def gradient(self, x):
+        """Valeur et gradient de la sortie par rapport aux poids, pour une position x (198,)"""
+        hidden = _sigmoid(x @ self.w1 + self.b1)
+        value = _sigmoid(hidden @ self.w2 + self.b2)
+        d_out = value * (1 - value)
+        d_hidden = d_out * self.w2 * hidden * (1 - hidden)
+        return value, (np.outer(x, d_hidden), d_hidden, d_out * hidden, d_out)
+
+    def candidate_positions(self, env, dice):
+        """
+        Renvoie (séquences jouables, encodage (n, 198) des positions obtenues).
+        Les positions sont produites par apply/undo, sans copie de l'environnement.
+        """
+        plays = env.legal_plays(dice)
+        player = env.current_player
+        boards = np.empty((len(plays), 24, 2), dtype=np.int8)
+        bars = np.empty((len(plays), 2), dtype=np.int8)
+        for i, play in enumerate(plays):
+            tokens = [env.apply(move) for move in play]
+            boards[i] = env.board
+            bars[i] = env.bar
+            for token in reversed(tokens):
+                env.undo(token)
+        sides = np.full(len(plays), 1 - player)
+        return plays, encode_positions(boards, bars, sides)
+
+    def best_play(self, env, dice):
+        """Meilleure séquence pour le joueur au trait (None si aucun coup n'est jouable)"""
+        plays, x = self.candidate_positions(env, dice)
+        if not plays:
+            return None
+        values = self.forward(x)
+        best = np.argmax(values) if env.current_player == 0 else np.argmin(values)
+        return plays[best]
+
+    def save(self, path=TD_WEIGHTS_FILE):
+        np.savez(path, w1=self.w1, b1=self.b1, w2=self.w2, b2=self.b2,
+                 games_trained=self.games_trained)
+
+    @classmethod
+    def load(cls, path=TD_WEIGHTS_FILE):
+        data = np.load(path)
+        network = cls(hidden=len(data["b1"]))
+        network.w1, network.b1 = data["w1"], data["b1"]
+        network.w2, network.b2 = data["w2"], np.float32(data["b2"])
+        network.games_trained = int(data["games_trained"])
+        return network
+
+
+def train_td(network, num_games=1000, alpha=0.1, lam=0.7, seed=None, save_path=TD_WEIGHTS_FILE,
+             save_every=1000):
+    """
+    Entraîne le réseau par TD(λ) en jouant contre lui-même.
+    À chaque tour, le joueur au trait choisit la séquence de meilleure valeur ;
+    l'erreur temporelle entre deux positions successives met à jour les poids
+    via des traces d'éligibilité (décroissance lam).
+    """
+    env = BackgammonEnv(record_history=False, seed=seed)
+    params = [network.w1, network.b1, network.w2]
+    start = time.perf_counter()
+    for game in range(num_games):
+        env.reset()
+        traces = [np.zeros_like(p) for p in params] + [0.0]
+        value, grads = network.gradient(encode_env(env)[0])
+        while True:
+            traces = [lam * t + g for t, g in zip(traces, grads)]
+            play = network.best_play(env, env.roll_dice())
+            player = env.current_player
+            for move in play or ():
+                env.apply(move)
+            game_over = env.check_win()
+            if game_over:
+                target = 1.0 if player == 0 else 0.0
+            else:
+                env.end_turn()
+                target, grads = network.gradient(encode_env(env)[0])
+            delta = alpha * (target - value)
+            network.w1 += delta * traces[0]
+            network.b1 += delta * traces[1]
+            network.w2 += delta * traces[2]
+            network.b2 = np.float32(network.b2 + delta * traces[3])
+            if game_over:
+                break
+            value = target
+        network.games_trained += 1
+        if save_path and (game + 1) % save_every == 0:
+            network.save(save_path)
+    if save_path:
+        network.save(save_path)
+    elapsed = time.perf_counter() - start
+    print(f"Entraînement TD(λ) terminé : {num_games} parties en {elapsed:.1f} s.")
+    return network
+
+
+if __name__ == "__main__":
+    try:
+        net = TDNetwork.load()
+    except FileNotFoundError:
+        net = TDNetwork(seed=0)
+    train_td(net, num_games=100000)
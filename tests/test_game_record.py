@@ -0,0 +1,44 @@
+import numpy as np
+from backgammon_env import BackgammonEnv
+from backgammon_ai import BackgammonAI
+from game_record import GameRecordWriter, read_games
+
+
+def test_game_seed_replays_the_dice(tmp_path):
+    env = BackgammonEnv(record_history=False, seed=3)
+    ai = BackgammonAI(env)
+    ai.bearoff_db = None
+    path = tmp_path / "parties.bgr"
+    with GameRecordWriter(path) as writer:
+        for _ in range(3):
+            ai._play_training_game(writer)
+    games = list(read_games(path))
+    assert len({game.seed for game in games}) == 3
+    for game in games:
+        # _play_training_game lance les dés avant chaque coup enregistré
+        rolls = [tuple(dice) for dice in game.moves["dice"].tolist()]
+        env.reset(seed=game.seed)
+        replayed = [tuple(env.roll_dice()[:2]) for _ in rolls]
+        assert rolls == replayed
+
+
+def test_unrepresentable_seed_is_stored_as_unknown(tmp_path):
+    path = tmp_path / "parties.bgr"
+    with GameRecordWriter(path) as writer:
+        for seed in (np.random.SeedSequence(1), 2 ** 64, -5, None, np.int64(7)):
+            writer.begin_game(seed)
+            writer.record(0, [3, 1])
+            writer.end_game(0)
+    assert [game.seed for game in read_games(path)] == [None, None, None, None, 7]
+
+
+def test_game_seeds_do_not_depend_on_rolls():
+    quiet, busy = BackgammonEnv(seed=11), BackgammonEnv(seed=11)
+    seeds = [[], []]
+    for _ in range(3):
+        for rolls, env, found in ((0, quiet, seeds[0]), (5, busy, seeds[1])):
+            for _ in range(rolls):
+                env.roll_dice()
+            env.reset()
+            found.append(env.game_seed)
+    assert seeds[0] == seeds[1]
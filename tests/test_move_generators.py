@@ -0,0 +1,37 @@
+import numpy as np
+from backgammon_env import BackgammonEnv
+from backgammon_ai import DICE_ROLLS
+
+
+def _higher_die_bear_off(player, move):
+    src, dest, die = move
+    if src == "bar" or dest not in (0, 25):
+        return False
+    return die > (src if player == 0 else 25 - src)
+
+
+def test_table_generator_matches_loops():
+    rng = np.random.default_rng(7)
+    env = BackgammonEnv(record_history=False, seed=7)
+    covered = {"bar": 0, "bear_off": 0, "players": set()}
+    for _ in range(15):
+        env.reset()
+        while not env.check_win():
+            mover = env.current_player
+            # Les deux joueurs au trait dans chaque position rencontrée, pour les 21 lancers
+            for player in (0, 1):
+                env.current_player = player
+                for dice, _ in DICE_ROLLS:
+                    moves = env._valid_moves_tables(dice)
+                    assert moves == env._valid_moves_loops(dice), (env.position_key(), dice)
+                    if moves:
+                        covered["players"].add(player)
+                    covered["bar"] += any(move[0] == "bar" for move in moves)
+                    covered["bear_off"] += any(_higher_die_bear_off(player, move) for move in moves)
+            env.current_player = mover
+            plays = env.legal_plays(env.roll_dice())
+            for move in plays[rng.integers(len(plays))] if plays else ():
+                env.apply(move)
+            if not env.check_win():
+                env.end_turn()
+    assert covered["bar"] and covered["bear_off"] and covered["players"] == {0, 1}
@@ -0,0 +1,73 @@
+import pytest
+import numpy as np
+from backgammon_env import BackgammonEnv
+from backgammon_ai import BackgammonAI
+from evaluation_cache import EvaluationCache
+from td_network import TDNetwork
+
+
+def _positions(count, seed=0):
+    """Positions (clé, dés) tirées de parties jouées au hasard"""
+    rng = np.random.default_rng(seed)
+    env = BackgammonEnv(record_history=False, seed=seed)
+    positions = []
+    while len(positions) < count:
+        env.reset()
+        while not env.check_win() and len(positions) < count:
+            dice = env.roll_dice()
+            plays = env.legal_plays(dice)
+            if plays:
+                positions.append((env.position_key(), dice))
+                for move in plays[rng.integers(len(plays))]:
+                    env.apply(move)
+            if not env.check_win():
+                env.end_turn()
+    return positions
+
+
+def test_search_depth_one_matches_network_best_play():
+    # La recherche à 1 pli évalue les positions obtenues avec l'adversaire au trait, comme best_play
+    network = TDNetwork(seed=1)
+    env = BackgammonEnv(record_history=False)
+    ai = BackgammonAI(env, network=network, cache=EvaluationCache())
+    for key, dice in _positions(200):
+        env.set_position_key(key)
+        expected = network.best_play(env, dice)
+        value, play = ai._max_node(dice, 1, 1.0, root=True)
+        if play != expected:
+            # Seule une égalité d'évaluation (aux arrondis près) peut départager autrement
+            player = env.current_player
+            tokens = ai._apply_play(expected)
+            other = ai._evaluate_position(player, to_move=1 - player)
+            ai._undo_play(tokens)
+            assert abs(other - value) < 1e-6
+        assert env.position_key() == key
+
+
+def test_search_runs_once_per_turn():
+    env = BackgammonEnv(record_history=False)
+    ai = BackgammonAI(env, search_depth=1, cache=EvaluationCache())
+    ai.bearoff_db = None
+    searches = []
+    search_play = ai.search_play
+    ai.search_play = lambda dice: searches.append(dice) or search_play(dice)
+    for key, dice in _positions(20, seed=2):
+        env.set_position_key(key)
+        dice = list(dice)
+        expected = ai.search_play(dice)
+        searches.clear()
+        played = []
+        while dice and env.valid_moves(dice):
+            move = ai.ai_move(env.valid_moves(dice), dice)
+            env.apply(move)
+            dice.remove(move[2])
+            played.append(move)
+        assert len(searches) == 1
+        assert played == list(expected)
+
+
+def test_anytime_play_requires_a_budget():
+    ai = BackgammonAI(BackgammonEnv(record_history=False), cache=EvaluationCache())
+    with pytest.raises(ValueError):
+        ai.anytime_play([3, 1])
+    assert ai.anytime_play([3, 1], budget=0.05)
@@ -0,0 +1,80 @@
+import gc
+import weakref
+from game_statistics import GameStatistics
+
+
+def _total(stats):
+    return stats.get_win_percentages()["total_games"]
+
+
+def test_columnar_instances_share_one_writer(tmp_path):
+    path = str(tmp_path / "game_stats.csv")
+    first = GameStatistics(path, backend="columnar")
+    second = GameStatistics(path, backend="columnar")
+    first.store.segment_rows = second.store.segment_rows = 5
+    for _ in range(2):
+        second.add_win(1, 10)
+    for _ in range(12):
+        first.add_win(2, 20)
+    assert _total(second) == 14
+    # La seconde instance compacte à son tour sans écraser les segments de la première
+    for _ in range(5):
+        second.add_win(1, 10)
+    first.save_stats()
+    second.save_stats()
+    fresh = GameStatistics(path, backend="columnar")
+    assert _total(first) == _total(second) == _total(fresh) == len(fresh.df) == 19
+
+
+def test_existing_history_aggregates_are_saved(tmp_path):
+    path = tmp_path / "game_stats.csv"
+    path.write_text("date,winner,moves_count\n2024-01-01 10:00:00,team1,30\n2024-01-02 10:00:00,team2,40\n")
+    assert _total(GameStatistics(str(path))) == 2
+    # Sans nouvelle partie, les agrégats relus sont sauvegardés pour le processus suivant
+    assert (tmp_path / "game_stats.csv.agg.json").exists()
+
+
+def test_truncated_line_is_ignored_then_repaired(tmp_path):
+    path = tmp_path / "game_stats.csv"
+    # Arrêt brutal au milieu de l'écriture de la dernière ligne
+    path.write_text("date,winner,moves_count\n2024-01-01 10:00:00,team1,30\n2024-01-01 11:0")
+    stats = GameStatistics(str(path))
+    assert len(stats.df) == 1
+    assert _total(stats) == 1
+    stats.add_win(2, 40)
+    stats.save_stats()
+    # La ligne interrompue a été tronquée avant l'ajout
+    lines = path.read_text().splitlines()
+    assert len(lines) == 3 and lines[1] == "2024-01-01 10:00:00,team1,30" and lines[2].endswith(",team2,40")
+    fresh = GameStatistics(str(path))
+    assert list(fresh.df["winner"]) == ["team1", "team2"]
+    assert _total(fresh) == 2
+
+
+def test_shards_are_merged(tmp_path):
+    path = str(tmp_path / "game_stats.csv")
+    writers = [GameStatistics(path, shard=shard) for shard in range(3)]
+    for shard, stats in enumerate(writers):
+        for _ in range(shard + 1):
+            stats.add_win(1 + shard % 2, 10 * (shard + 1))
+        stats.save_stats()
+    # Une partie du dernier shard interrompue en cours d'écriture
+    with open(tmp_path / "game_stats.2.csv", "a") as f:
+        f.write("2024-01-01 12:00:00,te")
+    merged = GameStatistics(path)
+    assert len(merged.df) == 6
+    assert list(merged.df["date"]) == sorted(merged.df["date"])
+    result = merged.get_win_percentages()
+    assert (result["total_games"], result["team1_wins"], result["team2_wins"]) == (6, 4, 2)
+    assert result["avg_moves_team1"] == (10 + 3 * 30) / 4
+
+
+def test_close_releases_the_store(tmp_path):
+    stats = GameStatistics(str(tmp_path / "game_stats.csv"))
+    store = weakref.ref(stats.store)
+    stats.add_win(1, 30)
+    stats.close()
+    del stats
+    gc.collect()
+    assert store() is None
+    assert _total(GameStatistics(str(tmp_path / "game_stats.csv"))) == 1